@@ -0,0 +1,49 @@
+"""
+Compression benchmark: bandwidth saved and CPU spent per catalog response.
+
+For restaurant pages at the default and maximum page size, it compares:
+- compressing on every request at the middleware's settings;
+- the stored-encoding path for cached payloads (services.compression.CompressedBody),
+  where one compression at the stronger precompressed settings is paid per
+  cache entry and later requests only look the bytes up.
+brotli rows appear when the brotli package is installed.
+
+Runs in process, no database needed. From the backend directory:
+
+    python -m benchmarks.compression
+"""
+import time
+from services.compression import ENCODINGS, CompressedBody, compress
+from services.serialization import serialize_page
+from benchmarks.serialization import synthetic_restaurant
+from config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+
+REPEAT = 50
+
+def best_ms(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    print(f"{'page':>10} {'encoding':>8} {'bytes':>8} {'ratio':>6} {'per request ms':>15} {'stored bytes':>13} {'first ms':>9} {'cached ms':>10}")
+    for size in (PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX):
+        body = serialize_page([synthetic_restaurant(i) for i in range(size)], None, None)
+        print(f"{size:>4} items {'identity':>8} {len(body):>8}")
+        for encoding in ENCODINGS:
+            on_the_fly = compress(body, encoding)
+            per_request_ms = best_ms(lambda: compress(body, encoding))
+            first_ms = best_ms(lambda: CompressedBody(body).encoded(encoding))
+            payload = CompressedBody(body)
+            stored = payload.encoded(encoding)
+            cached_ms = best_ms(lambda: payload.encoded(encoding))
+            print(
+                f"{size:>4} items {encoding:>8} {len(on_the_fly):>8} {len(body) / len(on_the_fly):>5.1f}x"
+                f" {per_request_ms:>15.3f} {len(stored):>13} {first_ms:>9.3f} {cached_ms:>10.4f}"
+            )
+
+if __name__ == "__main__":
+    main()
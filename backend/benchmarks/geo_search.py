@@ -0,0 +1,100 @@
+"""
+Near-me benchmark: full catalog scan vs $geoNear on the 2dsphere index.
+
+Seeds 100k synthetic restaurants scattered around Lisbon in a scratch
+database on MONGO_URL. It then compares, for a few user locations:
+
+- "scan": what clients had to do before, fetching the whole catalog and
+  filtering by delivery radius in process;
+- services.geo.near_restaurants: the first page of deliverable restaurants,
+  nearest first.
+
+Run from the backend directory:
+
+    python -m benchmarks.geo_search
+"""
+from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+import math
+import random
+import time
+from config import MONGO_URL, DEFAULT_DELIVERY_RADIUS_KM
+from indexes import ensure_indexes
+from services.geo import near_restaurants, restaurant_location
+from benchmarks.serialization import synthetic_restaurant
+
+BENCH_DB_NAME = "vizinhando_bench_geo"
+RESTAURANTS = 100_000
+BATCH = 10_000
+PAGE = 50
+REPEAT = 5
+
+# Around Lisbon, roughly 40 x 40 km
+CENTER = (38.72, -9.14)
+SPREAD = 0.2
+
+USERS = [(38.7107, -9.1422), (38.7405, -9.1455), (38.80, -9.00), (39.50, -8.00)]
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * 6_371_000 * math.asin(math.sqrt(h))
+
+async def seed(db):
+    await db.restaurants.drop()
+    random.seed(42)
+    for start in range(0, RESTAURANTS, BATCH):
+        documents = []
+        for i in range(start, start + BATCH):
+            restaurant = synthetic_restaurant(i)
+            restaurant["address"]["coordinates"] = {
+                "lat": CENTER[0] + random.uniform(-SPREAD, SPREAD),
+                "lng": CENTER[1] + random.uniform(-SPREAD, SPREAD),
+            }
+            restaurant["deliveryRadiusKm"] = random.choice([2.0, 3.0, 5.0, 8.0])
+            restaurant["location"] = restaurant_location(restaurant["address"])
+            documents.append(restaurant)
+        await db.restaurants.insert_many(documents)
+    await ensure_indexes(db)
+
+async def scan(db, lat, lng):
+    """The whole catalog over the wire, radius check and sort in process"""
+    restaurants = await db.restaurants.find({}, {"address.coordinates": 1, "deliveryRadiusKm": 1}).to_list(None)
+    nearby = []
+    for restaurant in restaurants:
+        coordinates = restaurant["address"]["coordinates"]
+        distance = haversine_m(lat, lng, coordinates["lat"], coordinates["lng"])
+        if distance <= restaurant.get("deliveryRadiusKm", DEFAULT_DELIVERY_RADIUS_KM) * 1000:
+            nearby.append((distance, restaurant["_id"]))
+    nearby.sort()
+    return nearby[:PAGE]
+
+async def geo_near(db, lat, lng):
+    restaurants, _ = await near_restaurants(db, lat, lng, {}, PAGE, projection={"name": 1})
+    return restaurants
+
+async def measure(strategy, db, lat, lng):
+    best, count = float("inf"), 0
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        count = len(await strategy(db, lat, lng))
+        best = min(best, time.perf_counter() - start)
+    return count, best * 1000
+
+async def main():
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[BENCH_DB_NAME]
+    try:
+        print(f"Seeding {RESTAURANTS} restaurants...")
+        await seed(db)
+        print(f"{'user location':>22} {'strategy':>9} {'results':>8} {'best ms':>10}")
+        for lat, lng in USERS:
+            for label, strategy in (("scan", scan), ("$geoNear", geo_near)):
+                count, elapsed = await measure(strategy, db, lat, lng)
+                print(f"{f'{lat:.4f},{lng:.4f}':>22} {label:>9} {count:>8} {elapsed:>10.1f}")
+    finally:
+        await client.drop_database(BENCH_DB_NAME)
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
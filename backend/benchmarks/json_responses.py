@@ -0,0 +1,68 @@
+"""
+Response rendering throughput: Starlette's stdlib JSONResponse vs the
+app-wide ORJSONResponse, for restaurant lists and order histories.
+
+Runs in process, no database needed. From the backend directory:
+
+    python -m benchmarks.json_responses
+"""
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from bson import ObjectId
+from datetime import datetime
+import time
+from models.order import OrderResponse
+from services.serialization import ORJSONResponse
+from benchmarks.serialization import synthetic_restaurant
+
+SIZES = [100, 1000]
+DURATION = 1.0
+
+def synthetic_order(i: int) -> dict:
+    now = datetime.utcnow()
+    return OrderResponse(
+        id=str(ObjectId()),
+        userId=str(ObjectId()),
+        restaurantId=str(ObjectId()),
+        restaurantName=f"Restaurante {i % 20}",
+        items=[
+            {"menuItemId": ObjectId(), "name": "Bacalhau à Brás", "price": 14.5, "quantity": 2},
+            {"menuItemId": ObjectId(), "name": "Pastel de Nata", "price": 1.2, "quantity": 4},
+        ],
+        deliveryAddress={"street": "Rua das Flores, 123", "city": "Lisboa", "postalCode": "1200-192"},
+        paymentMethod="mbway",
+        subtotal=33.8,
+        deliveryFee=2.5,
+        serviceFee=0.99,
+        total=37.29,
+        status="delivered",
+        createdAt=now,
+        updatedAt=now,
+    ).model_dump(mode="json")
+
+def throughput(response_class, content):
+    """Responses rendered per second and MB/s, over DURATION seconds"""
+    count, size = 0, 0
+    deadline = time.perf_counter() + DURATION
+    while time.perf_counter() < deadline:
+        size = len(response_class(content).body)
+        count += 1
+    return count / DURATION, count * size / DURATION / 1e6
+
+def main():
+    print(f"{'payload':>20} {'stdlib resp/s':>14} {'orjson resp/s':>14} {'stdlib MB/s':>12} {'orjson MB/s':>12}")
+    for size in SIZES:
+        payloads = {
+            f"{size} restaurants": jsonable_encoder(
+                {"items": [synthetic_restaurant(i) for i in range(size)], "next_cursor": None},
+                custom_encoder={ObjectId: str}
+            ),
+            f"{size} orders": {"items": [synthetic_order(i) for i in range(size)], "next_cursor": None},
+        }
+        for label, content in payloads.items():
+            stdlib_rps, stdlib_mbps = throughput(JSONResponse, content)
+            orjson_rps, orjson_mbps = throughput(ORJSONResponse, content)
+            print(f"{label:>20} {stdlib_rps:>14.0f} {orjson_rps:>14.0f} {stdlib_mbps:>12.1f} {orjson_mbps:>12.1f}")
+
+if __name__ == "__main__":
+    main()
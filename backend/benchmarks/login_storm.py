@@ -0,0 +1,71 @@
+"""
+Login storm load test: catalog latency with and without concurrent bcrypt logins.
+
+Runs against a live server (BACKEND_URL, default http://localhost:8001). It
+registers one throwaway user, then samples GET /api/categories/ latency on its
+own, and again while LOGIN_CONCURRENCY threads log in back to back. With
+hashing off the event loop the p99 of the catalog endpoint should stay flat.
+
+    python -m benchmarks.login_storm
+"""
+from concurrent.futures import ThreadPoolExecutor
+import os
+import statistics
+import threading
+import time
+import uuid
+import requests
+
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8001")
+API_BASE_URL = f"{BACKEND_URL}/api"
+LOGIN_CONCURRENCY = 32
+SAMPLE_SECONDS = 10
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def sample_catalog(stop: threading.Event):
+    session = requests.Session()
+    latencies = []
+    deadline = time.perf_counter() + SAMPLE_SECONDS
+    while time.perf_counter() < deadline and not stop.is_set():
+        start = time.perf_counter()
+        session.get(f"{API_BASE_URL}/categories/").raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def login_loop(credentials, stop: threading.Event, counts: dict):
+    session = requests.Session()
+    while not stop.is_set():
+        response = session.post(f"{API_BASE_URL}/users/login", json=credentials)
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+def report(label, latencies):
+    print(
+        f"{label:>14}: n={len(latencies):>6} p50={statistics.median(latencies):7.1f}ms "
+        f"p99={percentile(latencies, 99):7.1f}ms max={max(latencies):7.1f}ms"
+    )
+
+def main():
+    credentials = {"email": f"storm-{uuid.uuid4().hex[:8]}@example.com", "password": "storm-password"}
+    requests.post(f"{API_BASE_URL}/users/register", json={
+        **credentials, "name": "Login Storm", "phone": "+351 900 000 000"
+    }).raise_for_status()
+
+    report("baseline", sample_catalog(threading.Event()))
+
+    stop = threading.Event()
+    counts = {}
+    with ThreadPoolExecutor(max_workers=LOGIN_CONCURRENCY) as pool:
+        for _ in range(LOGIN_CONCURRENCY):
+            pool.submit(login_loop, credentials, stop, counts)
+        try:
+            report("login storm", sample_catalog(stop))
+        finally:
+            stop.set()
+
+    print(f"login responses by status: {counts}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Order listing benchmark: per-order restaurant lookups vs one batched $in lookup.
+
+Seeds a scratch database on MONGO_URL, then reports database round-trips and
+latency for 10/100/1000 orders. Run from the backend directory:
+
+    python -m benchmarks.order_listing
+"""
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from bson import ObjectId
+from datetime import datetime
+import asyncio
+import time
+from config import MONGO_URL
+from services.orders import build_order_responses, to_order_response
+
+BENCH_DB_NAME = "vizinhando_bench_orders"
+SIZES = [10, 100, 1000]
+RESTAURANTS = 50
+REPEAT = 5
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+async def list_orders_n_plus_one(db, orders):
+    """The original implementation: one find_one per order"""
+    responses = []
+    for order in orders:
+        restaurant = await db.restaurants.find_one({"_id": order["restaurantId"]})
+        restaurant_name = restaurant["name"] if restaurant else "Unknown Restaurant"
+        responses.append(to_order_response(order, restaurant_name))
+    return responses
+
+async def seed(db, user_id, size):
+    await db.orders.delete_many({})
+    await db.restaurants.delete_many({})
+    restaurant_ids = [ObjectId() for _ in range(RESTAURANTS)]
+    await db.restaurants.insert_many(
+        [{"_id": rid, "name": f"Restaurant {i}"} for i, rid in enumerate(restaurant_ids)]
+    )
+    now = datetime.utcnow()
+    await db.orders.insert_many([{
+        "userId": user_id,
+        "restaurantId": restaurant_ids[i % RESTAURANTS],
+        "items": [{"menuItemId": ObjectId(), "name": "Item", "price": 9.5, "quantity": 1}],
+        "deliveryAddress": {"street": "Rua A", "city": "Lisboa", "postalCode": "1000-001"},
+        "paymentMethod": "mbway",
+        "subtotal": 9.5,
+        "deliveryFee": 2.5,
+        "serviceFee": 0.5,
+        "total": 12.5,
+        "status": "pending",
+        "createdAt": now,
+        "updatedAt": now,
+    } for i in range(size)])
+
+async def measure(db, counter, user_id, size, strategy):
+    best = float("inf")
+    for _ in range(REPEAT):
+        counter.count = 0
+        start = time.perf_counter()
+        orders = await db.orders.find({"userId": user_id}).sort("createdAt", -1).to_list(size)
+        await strategy(db, orders)
+        best = min(best, time.perf_counter() - start)
+    return counter.count, best * 1000
+
+async def main():
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(MONGO_URL, event_listeners=[counter])
+    db = client[BENCH_DB_NAME]
+    user_id = ObjectId()
+    try:
+        print(f"{'orders':>7} {'strategy':>12} {'round-trips':>12} {'best ms':>10}")
+        for size in SIZES:
+            await seed(db, user_id, size)
+            for label, strategy in (("n+1", list_orders_n_plus_one), ("batched $in", build_order_responses)):
+                round_trips, elapsed = await measure(db, counter, user_id, size, strategy)
+                print(f"{size:>7} {label:>12} {round_trips:>12} {elapsed:>10.1f}")
+    finally:
+        await client.drop_database(BENCH_DB_NAME)
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+"""
+Order pricing benchmark: per-line menu lookups vs one batched $in lookup.
+
+Seeds a scratch database on MONGO_URL, then reports database round-trips and
+latency for pricing orders of 1/5/10/25/50 line items. Run from the backend
+directory:
+
+    python -m benchmarks.order_pricing
+"""
+from motor.motor_asyncio import AsyncIOMotorClient
+from bson import ObjectId
+import asyncio
+import time
+from config import MONGO_URL
+from models.order import OrderItemCreate
+from services.orders import price_order
+from benchmarks.order_listing import CommandCounter
+
+BENCH_DB_NAME = "vizinhando_bench_pricing"
+SIZES = [1, 5, 10, 25, 50]
+MENU_SIZE = 60
+REPEAT = 20
+
+async def price_order_per_line(db, restaurant_id, items):
+    """One find_one per line item, the shape a naive validation loop takes"""
+    restaurant = await db.restaurants.find_one({"_id": ObjectId(restaurant_id)}, {"name": 1, "deliveryFee": 1})
+    subtotal = 0.0
+    for item in items:
+        menu_item = await db.menu_items.find_one(
+            {"_id": ObjectId(item.menuItemId), "restaurantId": restaurant["_id"]},
+            {"name": 1, "price": 1, "isAvailable": 1}
+        )
+        subtotal += menu_item["price"] * item.quantity
+    return round(subtotal, 2)
+
+async def seed(db):
+    await db.restaurants.delete_many({})
+    await db.menu_items.delete_many({})
+    restaurant_id = ObjectId()
+    await db.restaurants.insert_one({"_id": restaurant_id, "name": "Bench Restaurant", "deliveryFee": 2.5})
+    menu_ids = [ObjectId() for _ in range(MENU_SIZE)]
+    await db.menu_items.insert_many([{
+        "_id": menu_id,
+        "restaurantId": restaurant_id,
+        "name": f"Item {i}",
+        "price": 5 + i * 0.25,
+        "isAvailable": True,
+    } for i, menu_id in enumerate(menu_ids)])
+    return str(restaurant_id), [str(menu_id) for menu_id in menu_ids]
+
+async def measure(db, counter, restaurant_id, items, strategy):
+    best = float("inf")
+    for _ in range(REPEAT):
+        counter.count = 0
+        start = time.perf_counter()
+        await strategy(db, restaurant_id, items)
+        best = min(best, time.perf_counter() - start)
+    return counter.count, best * 1000
+
+async def main():
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(MONGO_URL, event_listeners=[counter])
+    db = client[BENCH_DB_NAME]
+    try:
+        restaurant_id, menu_ids = await seed(db)
+        print(f"{'lines':>6} {'strategy':>12} {'round-trips':>12} {'best ms':>10}")
+        for size in SIZES:
+            items = [OrderItemCreate(menuItemId=menu_ids[i], quantity=1 + i % 3) for i in range(size)]
+            for label, strategy in (("per line", price_order_per_line), ("batched $in", price_order)):
+                round_trips, elapsed = await measure(db, counter, restaurant_id, items, strategy)
+                print(f"{size:>6} {label:>12} {round_trips:>12} {elapsed:>10.2f}")
+    finally:
+        await client.drop_database(BENCH_DB_NAME)
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Restaurant search benchmark: unanchored case-insensitive $regex scans vs the
+indexed `searchTerms` prefix search, on 100k synthetic restaurants.
+
+Seeds a scratch database on MONGO_URL. Run from the backend directory:
+
+    python -m benchmarks.restaurant_search
+"""
+from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+import random
+import time
+from config import MONGO_URL
+from indexes import INDEXES
+from services.search import derived_terms, search_restaurants
+from services.restaurant_query import build_restaurant_query
+
+BENCH_DB_NAME = "vizinhando_bench_search"
+RESTAURANTS = 100_000
+BATCH = 5_000
+REPEAT = 5
+PAGE = 50
+
+# What a user types, keystroke by keystroke
+QUERIES = ["h", "ha", "ham", "hamb", "hambúrg", "pizza mar", "promoções", "sushi", "tasca lisboa"]
+
+WORDS = [
+    "Tasca", "Pizza", "Sushi", "Hambúrgueres", "Churrasqueira", "Marisqueira", "Padaria",
+    "Pastelaria", "Cantina", "Taberna", "Lisboa", "Porto", "Bairro", "Real", "Nonna",
+    "Margherita", "Grelhados", "Vegetariano", "Promoções", "Doces", "Bacalhau", "Francesinha",
+]
+CUISINES = ["Portuguesa", "Italiana", "Japonesa", "Americana", "Brasileira", "Vegetariana"]
+
+def synthetic_restaurant(rng: random.Random) -> dict:
+    restaurant = {
+        "name": " ".join(rng.sample(WORDS, 2)),
+        "description": " ".join(rng.sample(WORDS, 6)),
+        "cuisine": rng.choice(CUISINES),
+        "categories": rng.sample(WORDS, 2),
+    }
+    restaurant.update(derived_terms(restaurant))
+    return restaurant
+
+async def seed(db):
+    await db.restaurants.drop()
+    await db.restaurants.create_indexes(INDEXES["restaurants"])
+    rng = random.Random(42)
+    for _ in range(RESTAURANTS // BATCH):
+        await db.restaurants.insert_many([synthetic_restaurant(rng) for _ in range(BATCH)])
+
+async def regex_search(db, search):
+    """The original implementation"""
+    query = {"$or": [
+        {"name": {"$regex": search, "$options": "i"}},
+        {"description": {"$regex": search, "$options": "i"}},
+        {"cuisine": {"$regex": search, "$options": "i"}},
+    ]}
+    return await db.restaurants.find(query).to_list(PAGE)
+
+async def indexed_search(db, search):
+    restaurant_query = build_restaurant_query(search=search)
+    restaurants, _, _ = await search_restaurants(db, restaurant_query.filter, restaurant_query.search_tokens, PAGE)
+    return restaurants
+
+async def measure(db, strategy, search):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        results = await strategy(db, search)
+        best = min(best, time.perf_counter() - start)
+    return len(results), best * 1000
+
+async def main():
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[BENCH_DB_NAME]
+    try:
+        await seed(db)
+        print(f"{'query':>14} {'regex hits':>11} {'regex ms':>9} {'index hits':>11} {'index ms':>9}")
+        for search in QUERIES:
+            regex_hits, regex_ms = await measure(db, regex_search, search)
+            index_hits, index_ms = await measure(db, indexed_search, search)
+            print(f"{search:>14} {regex_hits:>11} {regex_ms:>9.1f} {index_hits:>11} {index_ms:>9.1f}")
+    finally:
+        await client.drop_database(BENCH_DB_NAME)
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+Read-path serialization microbenchmark: model construction plus FastAPI
+response_model validation vs encoding raw documents straight to JSON bytes.
+
+Runs in process, no database needed. From the backend directory:
+
+    python -m benchmarks.serialization
+"""
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from bson import ObjectId
+from datetime import datetime
+import asyncio
+import time
+from models.restaurant import Restaurant
+from models.pagination import Page
+from services.serialization import serialize_page
+
+SIZES = [10, 100, 1000]
+REPEAT = 20
+
+def synthetic_restaurant(i: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        "_id": ObjectId(),
+        "name": f"Restaurante {i}",
+        "description": "Autêntica cozinha portuguesa com pratos tradicionais",
+        "image": "https://images.unsplash.com/photo-1414235077428-338989a2e8c0?w=400",
+        "cuisine": "Portuguesa",
+        "rating": 4.5,
+        "deliveryTime": "25-35 min",
+        "deliveryFee": 2.5,
+        "isOpen": True,
+        "promo": None,
+        "categories": ["Tradicional", "Grelhados"],
+        "address": {"street": "Rua das Flores, 123", "city": "Lisboa", "postalCode": "1200-192"},
+        "contact": {"phone": "+351 912 345 678", "email": "geral@restaurante.pt"},
+        "hours": {"open": "11:00", "close": "23:00"},
+        "createdAt": now,
+        "updatedAt": now,
+    }
+
+async def model_path(field, documents):
+    """What the handlers did: build models, then FastAPI validates and encodes again"""
+    page = Page(items=[Restaurant(**document) for document in documents], next_cursor=None)
+    content = await serialize_response(field=field, response_content=page)
+    return JSONResponse(content).body
+
+async def fast_path(field, documents):
+    return serialize_page(documents, None, Restaurant)
+
+async def measure(strategy, field, documents):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        body = await strategy(field, documents)
+        best = min(best, time.perf_counter() - start)
+    return len(body), best * 1000
+
+async def main():
+    field = create_response_field(name="response", type_=Page[Restaurant])
+    print(f"{'docs':>6} {'model ms':>9} {'fast ms':>9} {'speedup':>8} {'bytes':>9}")
+    for size in SIZES:
+        documents = [synthetic_restaurant(i) for i in range(size)]
+        _, model_ms = await measure(model_path, field, documents)
+        size_bytes, fast_ms = await measure(fast_path, field, documents)
+        print(f"{size:>6} {model_ms:>9.2f} {fast_ms:>9.2f} {model_ms / fast_ms:>7.1f}x {size_bytes:>9}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Order status benchmark: hundreds of simultaneous transitions on a live MongoDB.
+
+Seeds orders in a scratch database on MONGO_URL, races random status changes
+(with and without expectedUpdatedAt) against them and reports throughput and
+outcomes. The correctness check of the resulting histories runs in the test
+suite (tests/test_status_transitions.py). Run from the backend directory:
+
+    python -m benchmarks.status_transitions
+"""
+from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi import HTTPException
+from bson import ObjectId
+from collections import Counter
+import asyncio
+import random
+import time
+from config import MONGO_URL
+from services.orders import ORDER_STATUSES, transition_order, utcnow
+
+BENCH_DB_NAME = "vizinhando_bench_transitions"
+ORDERS = 20
+TRANSITIONS = 500
+
+async def seed(db):
+    await db.orders.delete_many({})
+    now = utcnow()
+    ids = [ObjectId() for _ in range(ORDERS)]
+    await db.orders.insert_many([{
+        "_id": order_id,
+        "userId": ObjectId(),
+        "status": "pending",
+        "statusHistory": [{"status": "pending", "at": now}],
+        "createdAt": now,
+        "updatedAt": now,
+    } for order_id in ids])
+    return ids
+
+async def attempt(db, order_id, status, outcomes):
+    # Half the callers read first and use optimistic concurrency, half don't
+    expected = None
+    if random.random() < 0.5:
+        current = await db.orders.find_one({"_id": order_id}, {"updatedAt": 1})
+        expected = current["updatedAt"]
+    try:
+        await transition_order(db, order_id, status, expected)
+    except HTTPException as e:
+        outcomes[e.status_code] += 1
+    else:
+        outcomes[200] += 1
+
+async def main():
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[BENCH_DB_NAME]
+    try:
+        ids = await seed(db)
+        statuses = sorted(ORDER_STATUSES)
+        outcomes = Counter()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            attempt(db, random.choice(ids), random.choice(statuses), outcomes)
+            for _ in range(TRANSITIONS)
+        ))
+        elapsed = time.perf_counter() - start
+
+        print(f"{TRANSITIONS} concurrent transitions over {ORDERS} orders in {elapsed * 1000:.0f} ms "
+              f"({TRANSITIONS / elapsed:.0f}/s)")
+        print("outcomes:", dict(sorted(outcomes.items())))
+    finally:
+        await client.drop_database(BENCH_DB_NAME)
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+"""
+Listing payload benchmark: full restaurant documents vs the summary projection.
+
+Encodes pages of synthetic restaurants as GET /api/restaurants returns them
+and as GET /api/restaurants/summary does, comparing body size and encode
+time. Runs in process, no database needed. From the backend directory:
+
+    python -m benchmarks.summary_payload
+"""
+import time
+from models.restaurant import Restaurant, RestaurantSummary
+from services.serialization import model_projection, serialize_page
+from benchmarks.serialization import synthetic_restaurant
+
+SIZES = [10, 100, 1000]
+REPEAT = 20
+
+QUOTE = {"fee": 3.0, "etaMinutes": 25, "deliveryTime": "25-35 min"}
+
+def documents_for(model, size):
+    """What the database returns for the model's projection"""
+    fields = set(model_projection(model))
+    documents = []
+    for i in range(size):
+        restaurant = {**synthetic_restaurant(i), "deliveryQuote": QUOTE}
+        documents.append({key: value for key, value in restaurant.items() if key in fields})
+    return documents
+
+def measure(model, documents):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        body = serialize_page(documents, None, model)
+        best = min(best, time.perf_counter() - start)
+    return len(body), best * 1000
+
+def main():
+    print(f"{'docs':>6} {'full bytes':>11} {'summary bytes':>14} {'saved':>6} {'full ms':>8} {'summary ms':>11}")
+    for size in SIZES:
+        full_bytes, full_ms = measure(Restaurant, documents_for(Restaurant, size))
+        summary_bytes, summary_ms = measure(RestaurantSummary, documents_for(RestaurantSummary, size))
+        saved = 1 - summary_bytes / full_bytes
+        print(f"{size:>6} {full_bytes:>11} {summary_bytes:>14} {saved:>6.0%} {full_ms:>8.2f} {summary_ms:>11.2f}")
+
+if __name__ == "__main__":
+    main()
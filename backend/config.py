@@ -10,7 +10,82 @@ load_dotenv(ROOT_DIR / '.env')
 MONGO_URL = os.environ['MONGO_URL']
 DB_NAME = os.environ['DB_NAME']
 
+# MongoDB connection pool settings
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+
+# Pagination settings
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "100"))
+
+# In-process catalog cache settings
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "60"))
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "512"))
+COLLECTION_VERSION_TTL_SECONDS = float(os.getenv("COLLECTION_VERSION_TTL_SECONDS", "2"))
+
+# Run read-path documents through their Pydantic models before serializing.
+# Off in production; enable in tests and development to catch schema drift.
+VALIDATE_RESPONSES = os.getenv("VALIDATE_RESPONSES", "false").lower() in ("1", "true", "yes")
+
 # Security settings
 SECRET_KEY = os.getenv("SECRET_KEY", "vizinhando_secret_key_2024")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+# Shared key restaurant staff send as X-Staff-Key; staff endpoints are closed while unset
+STAFF_API_KEY = os.getenv("STAFF_API_KEY")
+
+# Authenticated-principal cache: users resolved from a token subject, per process
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "15"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+# Password hashing pool: bcrypt runs off the event loop on these threads
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Logins waiting for a worker beyond this are rejected with 503
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+# Order pricing: totals are computed server-side from menu_items
+SERVICE_FEE = float(os.getenv("SERVICE_FEE", "1.00"))
+MAX_ORDER_LINES = int(os.getenv("MAX_ORDER_LINES", "50"))
+
+# Bulk NDJSON import/export: rows per insert_many and per export cursor batch
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+# Import responses list at most this many row errors (the failed count is exact)
+BULK_MAX_REPORTED_ERRORS = int(os.getenv("BULK_MAX_REPORTED_ERRORS", "1000"))
+
+# Order status push: "auto" uses a change stream when the deployment supports
+# one and falls back to in-process publishing; "change_stream" or "local" force a mode
+ORDER_EVENTS_SOURCE = os.getenv("ORDER_EVENTS_SOURCE", "auto")
+ORDER_EVENTS_QUEUE_SIZE = int(os.getenv("ORDER_EVENTS_QUEUE_SIZE", "100"))
+# Idle event streams send a comment this often so proxies keep them open
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+# Opening hours: timezone for restaurants without one, and how often the
+# precomputed open intervals are rebuilt to follow daylight saving changes
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "Europe/Lisbon")
+OPEN_HOURS_REFRESH_SECONDS = float(os.getenv("OPEN_HOURS_REFRESH_SECONDS", "3600"))
+
+# Delivery area: radius for restaurants without their own, and the farthest
+# any restaurant may deliver (bounds the geo index walk of near-me searches)
+DEFAULT_DELIVERY_RADIUS_KM = float(os.getenv("DEFAULT_DELIVERY_RADIUS_KM", "5"))
+MAX_DELIVERY_RADIUS_KM = float(os.getenv("MAX_DELIVERY_RADIUS_KM", "20"))
+
+# Delivery quotes: fee and ETA from distance, kitchen load and time of day,
+# memoized per restaurant for DELIVERY_QUOTE_TTL_SECONDS
+DELIVERY_QUOTE_TTL_SECONDS = float(os.getenv("DELIVERY_QUOTE_TTL_SECONDS", "60"))
+DELIVERY_QUOTE_MAX_ENTRIES = int(os.getenv("DELIVERY_QUOTE_MAX_ENTRIES", "10000"))
+DELIVERY_INCLUDED_KM = float(os.getenv("DELIVERY_INCLUDED_KM", "2"))
+DELIVERY_FEE_PER_KM = float(os.getenv("DELIVERY_FEE_PER_KM", "0.40"))
+DELIVERY_PEAK_SURCHARGE = float(os.getenv("DELIVERY_PEAK_SURCHARGE", "0.50"))
+DEFAULT_DELIVERY_DISTANCE_KM = float(os.getenv("DEFAULT_DELIVERY_DISTANCE_KM", "2"))
+
+# Response compression: bodies under COMPRESSION_MIN_SIZE bytes go out as is.
+# Cached catalog payloads are compressed once per encoding, so they use
+# stronger settings than responses compressed on the fly.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+PRECOMPRESSED_GZIP_LEVEL = int(os.getenv("PRECOMPRESSED_GZIP_LEVEL", "9"))
+PRECOMPRESSED_BROTLI_QUALITY = int(os.getenv("PRECOMPRESSED_BROTLI_QUALITY", "9"))
@@ -0,0 +1,133 @@
+"""
+Index declarations for every collection, applied idempotently at startup.
+
+Run directly to compare the declared indexes against a live database:
+
+    python indexes.py           # report missing, drifted and undeclared indexes
+    python indexes.py --apply   # also create the missing ones
+"""
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import IndexModel, ASCENDING, DESCENDING, GEOSPHERE
+from pymongo.errors import OperationFailure
+import asyncio
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Options that MongoDB adds to index_information() but that are not part of our spec
+IGNORED_OPTIONS = {"v", "ns", "key", "name", "background", "2dsphereIndexVersion"}
+
+INDEXES = {
+    "users": [
+        # get_current_user resolves the principal by email on every authenticated request
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "orders": [
+        # get_user_orders filters by userId and pages by (createdAt, _id) desc
+        IndexModel(
+            [("userId", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)],
+            name="userId_createdAt_id",
+        ),
+        # get_restaurant_orders: the kitchen queue by restaurant and status, oldest first
+        IndexModel(
+            [("restaurantId", ASCENDING), ("status", ASCENDING), ("createdAt", ASCENDING), ("_id", ASCENDING)],
+            name="restaurantId_status_createdAt_id",
+        ),
+        # get_restaurant_orders?since=: orders changed after a point in time
+        IndexModel(
+            [("restaurantId", ASCENDING), ("updatedAt", ASCENDING), ("_id", ASCENDING)],
+            name="restaurantId_updatedAt_id",
+        ),
+    ],
+    "menu_items": [
+        # get_restaurant_menu filters by restaurantId, menus are grouped by category
+        IndexModel([("restaurantId", ASCENDING), ("category", ASCENDING)], name="restaurantId_category"),
+        # get_restaurant_menu pages by _id within a restaurant
+        IndexModel([("restaurantId", ASCENDING), ("_id", ASCENDING)], name="restaurantId_id"),
+    ],
+    "restaurants": [
+        # category slider filters: normalized cuisine and categories, matched exactly
+        IndexModel([("categoryTerms", ASCENDING)], name="categoryTerms"),
+        # accent-folded tokens matched by anchored prefix regexes in search
+        IndexModel([("searchTerms", ASCENDING)], name="searchTerms"),
+        # open-now filter: $elemMatch on precomputed minute-of-week intervals
+        IndexModel([("openIntervals.s", ASCENDING), ("openIntervals.e", ASCENDING)], name="openIntervals"),
+        # near-me search: $geoNear over the point derived from address.coordinates
+        IndexModel([("location", GEOSPHERE)], name="location_2dsphere"),
+    ],
+}
+
+def _spec(document: dict) -> dict:
+    """Normalize an index document to its key and options for comparison"""
+    return {
+        "key": [(field, direction) for field, direction in document["key"].items()]
+        if isinstance(document["key"], dict) else list(document["key"]),
+        "options": {k: v for k, v in document.items() if k not in IGNORED_OPTIONS},
+    }
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    """Create all declared indexes; existing identical indexes are left untouched"""
+    for collection, models in INDEXES.items():
+        try:
+            await db[collection].create_indexes(models)
+        except OperationFailure as e:
+            # An index with the same name but a different spec already exists,
+            # or existing data violates a unique constraint. Keep serving traffic.
+            logger.error(f"Could not ensure indexes on {collection}: {e}")
+
+async def index_drift(db: AsyncIOMotorDatabase) -> dict:
+    """Compare declared indexes against the live database, per collection"""
+    report = {}
+    for collection, models in INDEXES.items():
+        existing = await db[collection].index_information()
+        existing.pop("_id_", None)
+
+        missing, drifted = [], []
+        for model in models:
+            declared = model.document
+            name = declared["name"]
+            if name not in existing:
+                missing.append(name)
+            elif _spec(declared) != _spec(existing[name]):
+                drifted.append({
+                    "name": name,
+                    "declared": _spec(declared),
+                    "live": _spec(existing[name]),
+                })
+
+        declared_names = {model.document["name"] for model in models}
+        undeclared = sorted(name for name in existing if name not in declared_names)
+
+        report[collection] = {"missing": missing, "drifted": drifted, "undeclared": undeclared}
+    return report
+
+async def main(apply: bool = False) -> int:
+    from config import MONGO_URL, DB_NAME
+
+    client = AsyncIOMotorClient(MONGO_URL)
+    db = client[DB_NAME]
+    try:
+        report = await index_drift(db)
+        clean = True
+        for collection, result in report.items():
+            for name in result["missing"]:
+                clean = False
+                print(f"MISSING    {collection}.{name}")
+            for drift in result["drifted"]:
+                clean = False
+                print(f"DRIFTED    {collection}.{drift['name']}: declared {drift['declared']}, live {drift['live']}")
+            for name in result["undeclared"]:
+                print(f"UNDECLARED {collection}.{name}")
+
+        if clean:
+            print("All declared indexes are present.")
+        elif apply:
+            await ensure_indexes(db)
+            print("Missing indexes created.")
+        return 0 if clean or apply else 1
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(apply="--apply" in sys.argv[1:])))
@@ -1,6 +1,5 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from bson import ObjectId
 from .restaurant import PyObjectId
 
 class Category(BaseModel):
@@ -14,7 +13,6 @@ class Category(BaseModel):
     class Config:
         validate_by_name = True
         arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
 
 class CategoryCreate(BaseModel):
     name: str
@@ -1,7 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
-from bson import ObjectId
 from .restaurant import PyObjectId
 
 class MenuItem(BaseModel):
@@ -19,7 +18,6 @@ class MenuItem(BaseModel):
     class Config:
         validate_by_name = True
         arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
 
 class MenuItemCreate(BaseModel):
     restaurantId: str
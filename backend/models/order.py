@@ -1,7 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
-from bson import ObjectId
 from .restaurant import PyObjectId, Address
 
 class OrderItem(BaseModel):
@@ -10,6 +9,10 @@ class OrderItem(BaseModel):
     price: float
     quantity: int
 
+class StatusChange(BaseModel):
+    status: str
+    at: datetime
+
 class Order(BaseModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     userId: PyObjectId
@@ -22,26 +25,34 @@ class Order(BaseModel):
     serviceFee: float
     total: float
     status: str = "pending"  # pending, confirmed, preparing, out_for_delivery, delivered, cancelled
+    statusHistory: List[StatusChange] = []
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
 
     class Config:
         validate_by_name = True
         arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+
+class OrderItemCreate(BaseModel):
+    # name and price are resolved from menu_items; any sent by the client are ignored
+    menuItemId: str
+    quantity: int = Field(ge=1)
 
 class OrderCreate(BaseModel):
     restaurantId: str
-    items: List[OrderItem]
+    items: List[OrderItemCreate] = Field(min_length=1)
     deliveryAddress: Address
     paymentMethod: str
-    subtotal: float
-    deliveryFee: float
-    serviceFee: float
-    total: float
+    # Computed server-side; accepted for compatibility with older clients but ignored
+    subtotal: Optional[float] = None
+    deliveryFee: Optional[float] = None
+    serviceFee: Optional[float] = None
+    total: Optional[float] = None
 
 class OrderStatusUpdate(BaseModel):
     status: str
+    # Optimistic concurrency: reject the change if the order was modified since
+    expectedUpdatedAt: Optional[datetime] = None
 
 class OrderResponse(BaseModel):
     id: str
@@ -56,5 +67,6 @@ class OrderResponse(BaseModel):
     serviceFee: float
     total: float
     status: str
+    statusHistory: List[StatusChange] = []
     createdAt: datetime
     updatedAt: datetime
\ No newline at end of file
@@ -1,12 +1,19 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional, Any
 from datetime import datetime
 from bson import ObjectId
+from pydantic_core import core_schema
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import re
+from config import DEFAULT_DELIVERY_RADIUS_KM, MAX_DELIVERY_RADIUS_KM
 
 class PyObjectId(ObjectId):
     @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(str, when_used="json"),
+        )
 
     @classmethod
     def validate(cls, v, validation_info=None):
@@ -15,21 +22,55 @@ class PyObjectId(ObjectId):
         return ObjectId(v)
 
     @classmethod
-    def __get_pydantic_json_schema__(cls, field_schema):
-        field_schema.update(type="string")
+    def __get_pydantic_json_schema__(cls, schema, handler):
+        return {"type": "string"}
+
+class Coordinates(BaseModel):
+    lat: float = Field(ge=-90, le=90)
+    lng: float = Field(ge=-180, le=180)
 
 class Address(BaseModel):
     street: str
     city: str
     postalCode: str
+    coordinates: Optional[Coordinates] = None
 
 class Contact(BaseModel):
     phone: str
     email: str
 
 class Hours(BaseModel):
-    open: str
+    open: str  # "HH:MM"; a close at or before open means closing after midnight
     close: str
+    timezone: Optional[str] = None  # IANA name, DEFAULT_TIMEZONE when unset
+
+class DeliveryQuote(BaseModel):
+    fee: float
+    etaMinutes: int
+    deliveryTime: str  # same "25-35 min" shape as Restaurant.deliveryTime
+
+# "HH:MM" from 00:00 to 23:59, plus 24:00 for the end of the day
+TIME_RE = re.compile(r"^(?:[01]?\d|2[0-3]):[0-5]\d$|^24:00$")
+
+class HoursCreate(Hours):
+    """Hours as written by clients, checked so open-now filtering can rely on them"""
+
+    @field_validator("open", "close")
+    @classmethod
+    def check_time(cls, value: str) -> str:
+        if not TIME_RE.match(value):
+            raise ValueError("must be a time as HH:MM")
+        return value
+
+    @field_validator("timezone")
+    @classmethod
+    def check_timezone(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None:
+            try:
+                ZoneInfo(value)
+            except (ZoneInfoNotFoundError, ValueError):
+                raise ValueError(f"unknown timezone {value!r}")
+        return value
 
 class Restaurant(BaseModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
@@ -40,19 +81,40 @@ class Restaurant(BaseModel):
     rating: float
     deliveryTime: str
     deliveryFee: float
+    deliveryRadiusKm: float = DEFAULT_DELIVERY_RADIUS_KM
     isOpen: bool = True
     promo: Optional[str] = None
     categories: List[str]
     address: Address
     contact: Contact
     hours: Hours
+    distanceKm: Optional[float] = None  # only in near-me listings
+    deliveryQuote: Optional[DeliveryQuote] = None  # only in listings, computed per request
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
 
     class Config:
         validate_by_name = True
         arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+
+class RestaurantSummary(BaseModel):
+    """What a restaurant card in the listing grid shows"""
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    name: str
+    description: str
+    image: str
+    rating: float
+    deliveryTime: str
+    deliveryFee: float
+    isOpen: bool = True
+    promo: Optional[str] = None
+    categories: List[str]
+    distanceKm: Optional[float] = None
+    deliveryQuote: Optional[DeliveryQuote] = None
+
+    class Config:
+        validate_by_name = True
+        arbitrary_types_allowed = True
 
 class RestaurantCreate(BaseModel):
     name: str
@@ -62,12 +124,13 @@ class RestaurantCreate(BaseModel):
     rating: float = 0.0
     deliveryTime: str
     deliveryFee: float
+    deliveryRadiusKm: float = Field(DEFAULT_DELIVERY_RADIUS_KM, gt=0, le=MAX_DELIVERY_RADIUS_KM)
     isOpen: bool = True
     promo: Optional[str] = None
     categories: List[str]
     address: Address
     contact: Contact
-    hours: Hours
+    hours: HoursCreate
 
 class RestaurantUpdate(BaseModel):
     name: Optional[str] = None
@@ -77,9 +140,10 @@ class RestaurantUpdate(BaseModel):
     rating: Optional[float] = None
     deliveryTime: Optional[str] = None
     deliveryFee: Optional[float] = None
+    deliveryRadiusKm: Optional[float] = Field(None, gt=0, le=MAX_DELIVERY_RADIUS_KM)
     isOpen: Optional[bool] = None
     promo: Optional[str] = None
     categories: Optional[List[str]] = None
     address: Optional[Address] = None
     contact: Optional[Contact] = None
-    hours: Optional[Hours] = None
\ No newline at end of file
+    hours: Optional[HoursCreate] = None
\ No newline at end of file
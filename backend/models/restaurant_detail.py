@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import List
+from .restaurant import Restaurant
+from .menu_item import MenuItem
+
+class MenuSection(BaseModel):
+    category: str
+    items: List[MenuItem]
+
+class RestaurantDetail(BaseModel):
+    restaurant: Restaurant
+    menu: List[MenuSection]
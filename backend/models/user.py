@@ -1,14 +1,14 @@
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional
 from datetime import datetime
-from bson import ObjectId
-from .restaurant import PyObjectId
+from .restaurant import PyObjectId, Coordinates
 
 class UserAddress(BaseModel):
     label: str
     street: str
     city: str
     postalCode: str
+    coordinates: Optional[Coordinates] = None
     isDefault: bool = False
 
 class User(BaseModel):
@@ -18,13 +18,13 @@ class User(BaseModel):
     password: str  # This will be hashed
     phone: str
     addresses: List[UserAddress] = []
+    tokenVersion: int = 0  # bumped to revoke every token issued so far
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
 
     class Config:
         validate_by_name = True
         arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
 
 class UserCreate(BaseModel):
     name: str
@@ -51,4 +51,8 @@ class UserResponse(BaseModel):
 
 class Token(BaseModel):
     access_token: str
-    token_type: str
\ No newline at end of file
+    token_type: str
+    refresh_token: Optional[str] = None
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
\ No newline at end of file
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from services.bulk import export_ndjson, get_bulk_collection, import_ndjson, iter_lines
+from database import get_database
+
+router = APIRouter(prefix="/api/bulk", tags=["bulk"])
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+@router.post("/{collection}")
+async def bulk_import(collection: str, request: Request, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Import restaurants or menu_items from an NDJSON request body, one document per line"""
+    get_bulk_collection(collection)
+    return await import_ndjson(db, collection, iter_lines(request.stream()))
+
+@router.get("/{collection}")
+async def bulk_export(collection: str, restaurantId: Optional[str] = None, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Stream restaurants or menu_items as NDJSON; menu_items can be limited to one restaurant"""
+    get_bulk_collection(collection)
+    query = {}
+    if restaurantId is not None:
+        if collection != "menu_items":
+            raise HTTPException(status_code=400, detail="restaurantId only filters menu_items")
+        if not ObjectId.is_valid(restaurantId):
+            raise HTTPException(status_code=400, detail="Invalid restaurant ID")
+        query["restaurantId"] = ObjectId(restaurantId)
+    return StreamingResponse(export_ndjson(db, collection, query), media_type=NDJSON_MEDIA_TYPE)
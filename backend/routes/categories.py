@@ -1,27 +1,52 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime
 from models.category import Category, CategoryCreate
-from config import MONGO_URL, DB_NAME
+from models.pagination import Page
+from services.pagination import paginate
+from services.cache import categories_cache
+from services.conditional import CollectionVersion, conditional_get, bump_collection_version
+from services.compression import CompressedBody, compressed_response
+from services.serialization import model_projection, serialize_page, sparse_fields
+from config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+from database import get_database
 
 router = APIRouter(prefix="/api/categories", tags=["categories"])
 
-# MongoDB connection
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
+CATEGORY_PROJECTION = model_projection(Category)
 
-@router.get("/", response_model=List[Category])
-async def get_categories():
-    """Get all categories"""
-    categories = await db.categories.find().to_list(100)
-    return [Category(**category) for category in categories]
+@router.get("/", response_model=Page[Category])
+async def get_categories(
+    request: Request,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    version: CollectionVersion = Depends(conditional_get("categories")),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Get a page of categories; `fields=name,icon` returns only those fields"""
+    selected = sparse_fields(fields, Category)
+    
+    async def load():
+        categories, next_cursor = await paginate(
+            db.categories, {}, [("_id", 1)], limit, cursor,
+            projection=dict.fromkeys(selected, 1) if selected else CATEGORY_PROJECTION
+        )
+        return CompressedBody(serialize_page(categories, next_cursor, None if selected else Category))
+    
+    body = await categories_cache.get_or_load((version.version, selected, min(limit, PAGE_SIZE_MAX), cursor), load)
+    return compressed_response(request, body, version.headers)
 
 @router.post("/", response_model=Category)
-async def create_category(category: CategoryCreate):
+async def create_category(category: CategoryCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
     """Create a new category"""
     category_dict = category.dict()
+    category_dict["createdAt"] = category_dict["updatedAt"] = datetime.utcnow()
     
-    result = await db.categories.insert_one(category_dict)
-    created_category = await db.categories.find_one({"_id": result.inserted_id})
+    # insert_one sets category_dict["_id"]; no need to read the document back
+    await db.categories.insert_one(category_dict)
+    await bump_collection_version(db, "categories")
+    categories_cache.invalidate()
     
-    return Category(**created_category)
\ No newline at end of file
+    return Category(**category_dict)
\ No newline at end of file
@@ -1,43 +1,51 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from typing import List
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
 from datetime import datetime
 from models.menu_item import MenuItem, MenuItemCreate, MenuItemUpdate
-from config import MONGO_URL, DB_NAME
+from database import get_database
+from services.conditional import CollectionVersion, conditional_get, bump_collection_version
+from services.restaurant_detail import invalidate_restaurant_detail
+from services.serialization import JSONBytesResponse, model_projection, serialize_document
 
 router = APIRouter(prefix="/api/menu-items", tags=["menu-items"])
 
-# MongoDB connection
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
+MENU_ITEM_PROJECTION = model_projection(MenuItem)
 
 @router.post("/", response_model=MenuItem)
-async def create_menu_item(menu_item: MenuItemCreate):
+async def create_menu_item(menu_item: MenuItemCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
     """Create a new menu item"""
     menu_item_dict = menu_item.dict()
     menu_item_dict["restaurantId"] = ObjectId(menu_item_dict["restaurantId"])
     menu_item_dict["createdAt"] = menu_item_dict["updatedAt"] = datetime.utcnow()
     
-    result = await db.menu_items.insert_one(menu_item_dict)
-    created_item = await db.menu_items.find_one({"_id": result.inserted_id})
+    # insert_one sets menu_item_dict["_id"]; no need to read the document back
+    await db.menu_items.insert_one(menu_item_dict)
+    await bump_collection_version(db, "menu_items")
+    invalidate_restaurant_detail(menu_item_dict["restaurantId"])
     
-    return MenuItem(**created_item)
+    return MenuItem(**menu_item_dict)
 
 @router.get("/{item_id}", response_model=MenuItem)
-async def get_menu_item(item_id: str):
+async def get_menu_item(
+    item_id: str,
+    version: CollectionVersion = Depends(conditional_get("menu_items")),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
     """Get a specific menu item"""
     if not ObjectId.is_valid(item_id):
         raise HTTPException(status_code=400, detail="Invalid menu item ID")
     
-    item = await db.menu_items.find_one({"_id": ObjectId(item_id)})
+    item = await db.menu_items.find_one({"_id": ObjectId(item_id)}, MENU_ITEM_PROJECTION)
     if not item:
         raise HTTPException(status_code=404, detail="Menu item not found")
     
-    return MenuItem(**item)
+    return JSONBytesResponse(serialize_document(item, MenuItem), headers=version.headers)
 
 @router.put("/{item_id}", response_model=MenuItem)
-async def update_menu_item(item_id: str, item_update: MenuItemUpdate):
+async def update_menu_item(item_id: str, item_update: MenuItemUpdate, db: AsyncIOMotorDatabase = Depends(get_database)):
     """Update a menu item"""
     if not ObjectId.is_valid(item_id):
         raise HTTPException(status_code=400, detail="Invalid menu item ID")
@@ -45,26 +53,31 @@ async def update_menu_item(item_id: str, item_update: MenuItemUpdate):
     update_data = {k: v for k, v in item_update.dict().items() if v is not None}
     update_data["updatedAt"] = datetime.utcnow()
     
-    result = await db.menu_items.update_one(
-        {"_id": ObjectId(item_id)}, 
-        {"$set": update_data}
+    updated_item = await db.menu_items.find_one_and_update(
+        {"_id": ObjectId(item_id)},
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.matched_count == 0:
+    if updated_item is None:
         raise HTTPException(status_code=404, detail="Menu item not found")
     
-    updated_item = await db.menu_items.find_one({"_id": ObjectId(item_id)})
+    await bump_collection_version(db, "menu_items")
+    invalidate_restaurant_detail(updated_item["restaurantId"])
     return MenuItem(**updated_item)
 
 @router.delete("/{item_id}")
-async def delete_menu_item(item_id: str):
+async def delete_menu_item(item_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
     """Delete a menu item"""
     if not ObjectId.is_valid(item_id):
         raise HTTPException(status_code=400, detail="Invalid menu item ID")
     
-    result = await db.menu_items.delete_one({"_id": ObjectId(item_id)})
+    # find_one_and_delete returns the restaurant whose detail payload to drop
+    deleted_item = await db.menu_items.find_one_and_delete({"_id": ObjectId(item_id)}, {"restaurantId": 1})
     
-    if result.deleted_count == 0:
+    if deleted_item is None:
         raise HTTPException(status_code=404, detail="Menu item not found")
     
+    await bump_collection_version(db, "menu_items")
+    invalidate_restaurant_detail(deleted_item["restaurantId"])
     return {"message": "Menu item deleted successfully"}
\ No newline at end of file
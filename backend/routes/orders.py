@@ -1,160 +1,124 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import asyncio
 from models.order import Order, OrderCreate, OrderStatusUpdate, OrderResponse
-from models.user import User
-from services.auth import verify_token
-from config import MONGO_URL, DB_NAME
+from models.pagination import Page
+from services.auth import Principal, get_current_principal, get_stream_principal, require_staff
+from services.orders import build_order_responses, price_order, to_order_response, transition_order, utcnow
+from services.pagination import paginate
+from services.order_events import order_events, status_event
+from services.serialization import dumps
+from config import PAGE_SIZE_DEFAULT, SSE_HEARTBEAT_SECONDS
+from database import get_database
 
 router = APIRouter(prefix="/api/orders", tags=["orders"])
-security = HTTPBearer()
-
-# MongoDB connection
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
-
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
-    email = verify_token(token)
-    if email is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    user = await db.users.find_one({"email": email})
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    return User(**user)
 
 @router.post("/", response_model=OrderResponse)
-async def create_order(order: OrderCreate, current_user: User = Depends(get_current_user)):
-    """Create a new order"""
-    # Convert string restaurantId to ObjectId
-    restaurant_id = ObjectId(order.restaurantId)
-    
-    # Get restaurant info for response
-    restaurant = await db.restaurants.find_one({"_id": restaurant_id})
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
-    
-    # Convert order items menuItemId strings to ObjectIds
-    items_with_object_ids = []
-    for item in order.items:
-        item_dict = item.dict()
-        item_dict["menuItemId"] = ObjectId(item_dict["menuItemId"])
-        items_with_object_ids.append(item_dict)
+async def create_order(order: OrderCreate, principal: Principal = Depends(get_current_principal), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Create a new order, priced from the restaurant's current menu"""
+    priced = await price_order(db, order.restaurantId, order.items, order.deliveryAddress.dict())
+    restaurant_name = priced.pop("restaurantName")
     
-    order_dict = order.dict()
-    order_dict["userId"] = current_user.id
-    order_dict["restaurantId"] = restaurant_id
-    order_dict["items"] = items_with_object_ids
-    order_dict["status"] = "pending"
-    order_dict["createdAt"] = order_dict["updatedAt"] = datetime.utcnow()
+    order_dict = {
+        **priced,
+        "userId": principal.id,
+        "deliveryAddress": order.deliveryAddress.dict(),
+        "paymentMethod": order.paymentMethod,
+        "status": "pending",
+    }
+    order_dict["createdAt"] = order_dict["updatedAt"] = utcnow()
+    order_dict["statusHistory"] = [{"status": "pending", "at": order_dict["createdAt"]}]
     
-    result = await db.orders.insert_one(order_dict)
-    created_order = await db.orders.find_one({"_id": result.inserted_id})
+    # insert_one sets order_dict["_id"]; no need to read the document back
+    await db.orders.insert_one(order_dict)
     
-    return OrderResponse(
-        id=str(created_order["_id"]),
-        userId=str(created_order["userId"]),
-        restaurantId=str(created_order["restaurantId"]),
-        restaurantName=restaurant["name"],
-        items=created_order["items"],
-        deliveryAddress=created_order["deliveryAddress"],
-        paymentMethod=created_order["paymentMethod"],
-        subtotal=created_order["subtotal"],
-        deliveryFee=created_order["deliveryFee"],
-        serviceFee=created_order["serviceFee"],
-        total=created_order["total"],
-        status=created_order["status"],
-        createdAt=created_order["createdAt"],
-        updatedAt=created_order["updatedAt"]
+    return to_order_response(order_dict, restaurant_name)
+
+@router.get("/", response_model=Page[OrderResponse])
+async def get_user_orders(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    cursor: Optional[str] = None,
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Get a page of orders for the current user, newest first"""
+    orders, next_cursor = await paginate(
+        db.orders, {"userId": principal.id}, [("createdAt", -1), ("_id", -1)], limit, cursor
     )
+    return Page(items=await build_order_responses(db, orders), next_cursor=next_cursor)
+
+def _sse(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
 
-@router.get("/", response_model=List[OrderResponse])
-async def get_user_orders(current_user: User = Depends(get_current_user)):
-    """Get all orders for the current user"""
-    orders = await db.orders.find({"userId": current_user.id}).sort("createdAt", -1).to_list(100)
+@router.get("/events")
+async def stream_order_events(
+    orderId: Optional[str] = None,
+    principal: Principal = Depends(get_stream_principal),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Server-sent `order_status` events for the caller's orders.
+
+    Pass `orderId` to follow a single order; its current status is sent first,
+    so a client never misses a transition made just before it connected.
+    """
+    order_id = None
+    if orderId is not None:
+        if not ObjectId.is_valid(orderId):
+            raise HTTPException(status_code=400, detail="Invalid order ID")
+        order_id = ObjectId(orderId)
     
-    order_responses = []
-    for order in orders:
-        # Get restaurant name
-        restaurant = await db.restaurants.find_one({"_id": order["restaurantId"]})
-        restaurant_name = restaurant["name"] if restaurant else "Unknown Restaurant"
-        
-        order_responses.append(OrderResponse(
-            id=str(order["_id"]),
-            userId=str(order["userId"]),
-            restaurantId=str(order["restaurantId"]),
-            restaurantName=restaurant_name,
-            items=order["items"],
-            deliveryAddress=order["deliveryAddress"],
-            paymentMethod=order["paymentMethod"],
-            subtotal=order["subtotal"],
-            deliveryFee=order["deliveryFee"],
-            serviceFee=order["serviceFee"],
-            total=order["total"],
-            status=order["status"],
-            createdAt=order["createdAt"],
-            updatedAt=order["updatedAt"]
-        ))
+    async def events():
+        async with order_events.subscribe(principal.id) as queue:
+            if order_id is not None:
+                order = await db.orders.find_one(
+                    {"_id": order_id, "userId": principal.id}, {"userId": 1, "status": 1, "updatedAt": 1}
+                )
+                if order is not None:
+                    yield _sse("order_status", status_event(order))
+            
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if order_id is None or event["orderId"] == orderId:
+                    yield _sse("order_status", event)
     
-    return order_responses
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/{order_id}", response_model=OrderResponse)
-async def get_order(order_id: str, current_user: User = Depends(get_current_user)):
+async def get_order(order_id: str, principal: Principal = Depends(get_current_principal), db: AsyncIOMotorDatabase = Depends(get_database)):
     """Get a specific order"""
     if not ObjectId.is_valid(order_id):
         raise HTTPException(status_code=400, detail="Invalid order ID")
     
-    order = await db.orders.find_one({"_id": ObjectId(order_id), "userId": current_user.id})
+    order = await db.orders.find_one({"_id": ObjectId(order_id), "userId": principal.id})
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    # Get restaurant name
-    restaurant = await db.restaurants.find_one({"_id": order["restaurantId"]})
-    restaurant_name = restaurant["name"] if restaurant else "Unknown Restaurant"
-    
-    return OrderResponse(
-        id=str(order["_id"]),
-        userId=str(order["userId"]),
-        restaurantId=str(order["restaurantId"]),
-        restaurantName=restaurant_name,
-        items=order["items"],
-        deliveryAddress=order["deliveryAddress"],
-        paymentMethod=order["paymentMethod"],
-        subtotal=order["subtotal"],
-        deliveryFee=order["deliveryFee"],
-        serviceFee=order["serviceFee"],
-        total=order["total"],
-        status=order["status"],
-        createdAt=order["createdAt"],
-        updatedAt=order["updatedAt"]
-    )
+    order_responses = await build_order_responses(db, [order])
+    return order_responses[0]
 
-@router.put("/{order_id}/status")
-async def update_order_status(order_id: str, status_update: OrderStatusUpdate):
-    """Update order status (for restaurant owners)"""
+@router.put("/{order_id}/status", dependencies=[Depends(require_staff)])
+async def update_order_status(order_id: str, status_update: OrderStatusUpdate, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Update order status (restaurant staff, with X-Staff-Key), following ORDER_TRANSITIONS"""
     if not ObjectId.is_valid(order_id):
         raise HTTPException(status_code=400, detail="Invalid order ID")
     
-    valid_statuses = ["pending", "confirmed", "preparing", "out_for_delivery", "delivered", "cancelled"]
-    if status_update.status not in valid_statuses:
-        raise HTTPException(status_code=400, detail="Invalid status")
-    
-    result = await db.orders.update_one(
-        {"_id": ObjectId(order_id)},
-        {"$set": {"status": status_update.status, "updatedAt": datetime.utcnow()}}
-    )
-    
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    return {"message": f"Order status updated to {status_update.status}"}
\ No newline at end of file
+    order = await transition_order(db, ObjectId(order_id), status_update.status, status_update.expectedUpdatedAt)
+    order_events.publish_local(order)
+    return {
+        "message": f"Order status updated to {order['status']}",
+        "status": order["status"],
+        "statusHistory": order["statusHistory"],
+        "updatedAt": order["updatedAt"],
+    }
@@ -1,87 +1,242 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from typing import FrozenSet, List, Optional, Type
+from pydantic import BaseModel
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime
-from models.restaurant import Restaurant, RestaurantCreate, RestaurantUpdate
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from datetime import datetime, timezone
+from models.restaurant import Restaurant, RestaurantCreate, RestaurantSummary, RestaurantUpdate
 from models.menu_item import MenuItem
-from config import MONGO_URL, DB_NAME
+from models.restaurant_detail import RestaurantDetail
+from models.order import OrderResponse
+from models.pagination import Page
+from services.pagination import paginate
+from services.orders import ACTIVE_ORDER_STATUSES, ORDER_STATUSES, to_order_response
+from services.search import SEARCH_FIELDS, derived_terms, search_restaurants, sync_search_terms, touches_search_fields
+from services.opening_hours import open_intervals, open_now_filter, open_now_variant
+from services.geo import near_restaurants, restaurant_location, round_coordinates
+from services.delivery import QUOTE_PROJECTION, quote_restaurants, quote_window_start
+from services.restaurant_query import build_restaurant_query
+from services.cache import restaurants_cache
+from services.conditional import CollectionVersion, check_not_modified, conditional_get, bump_collection_version
+from services.restaurant_detail import get_restaurant_detail, invalidate_restaurant_detail
+from services.auth import require_staff
+from services.compression import CompressedBody, compressed_response
+from services.serialization import JSONBytesResponse, model_projection, serialize_document, serialize_page, sparse_fields
+from config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+from database import get_database
 
 router = APIRouter(prefix="/api/restaurants", tags=["restaurants"])
 
-# MongoDB connection
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
+RESTAURANT_PROJECTION = model_projection(Restaurant)
+RESTAURANT_FIELDS = frozenset(RESTAURANT_PROJECTION)
+SUMMARY_FIELDS = frozenset(model_projection(RestaurantSummary))
+MENU_ITEM_PROJECTION = model_projection(MenuItem)
 
-@router.get("/", response_model=List[Restaurant])
-async def get_restaurants(category: Optional[str] = None, search: Optional[str] = None):
-    """Get all restaurants, optionally filtered by category or search term"""
-    query = {}
+def listing_variant(request: Request) -> datetime:
+    """Listings carry delivery quotes, so they vary per quote window, and per minute with open=true"""
+    return max(filter(None, (quote_window_start(), open_now_variant(request))))
+
+async def list_restaurants(
+    request: Request,
+    db: AsyncIOMotorDatabase,
+    version: CollectionVersion,
+    fields: FrozenSet[str],
+    model: Optional[Type[BaseModel]],
+    category: Optional[str],
+    search: Optional[str],
+    limit: int,
+    cursor: Optional[str],
+    open: bool,
+    lat: Optional[float],
+    lng: Optional[float],
+) -> Response:
+    """
+    A page of restaurants with only `fields`, checked against `model` unless None.
+
+    Fields needed to rank, page or quote but not asked for are projected as
+    well and dropped before encoding, so nothing else leaves the database.
+    """
+    if (lat is None) != (lng is None):
+        raise HTTPException(status_code=400, detail="lat and lng must be given together")
+    near = round_coordinates(lat, lng) if lat is not None else None
     
-    if category and category != "all":
-        if category == "Promocões":
-            query["promo"] = {"$ne": None}
-        else:
-            query["$or"] = [
-                {"cuisine": {"$regex": category, "$options": "i"}},
-                {"categories": {"$in": [category]}}
-            ]
+    restaurant_query = build_restaurant_query(category, search)
+    if restaurant_query.matches_nothing:
+        return compressed_response(request, CompressedBody(serialize_page([], None, model)), version.headers)
+    query = restaurant_query.filter
+    if open:
+        query = {"$and": [query, open_now_filter()]} if query else open_now_filter()
     
-    if search:
-        query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}},
-            {"cuisine": {"$regex": search, "$options": "i"}}
-        ]
+    projection = {field: 1 for field in fields}
+    support = {}
+    if "deliveryQuote" in fields:
+        support.update(QUOTE_PROJECTION)
+    if restaurant_query.search_tokens:
+        support.update({field: 1 for field in SEARCH_FIELDS})
+    for path in support:
+        # Projecting both "hours" and "hours.timezone" is a path collision
+        if path.split(".")[0] not in projection:
+            projection[path] = 1
+    trim = fields != RESTAURANT_FIELDS
     
-    restaurants = await db.restaurants.find(query).to_list(1000)
-    return [Restaurant(**restaurant) for restaurant in restaurants]
+    async def load():
+        truncated = False
+        if near is not None:
+            restaurants, next_cursor = await near_restaurants(
+                db, *near, query, limit, cursor, projection=projection
+            )
+        elif restaurant_query.search_tokens:
+            restaurants, next_cursor, truncated = await search_restaurants(
+                db, query, restaurant_query.search_tokens, limit, cursor,
+                projection=projection
+            )
+        else:
+            restaurants, next_cursor = await paginate(
+                db.restaurants, query, [("_id", 1)], limit, cursor,
+                projection=projection
+            )
+        if "deliveryQuote" in fields:
+            distances = {restaurant["_id"]: restaurant["distanceKm"] for restaurant in restaurants if "distanceKm" in restaurant}
+            quotes = await quote_restaurants(db, restaurants, distances)
+            for restaurant in restaurants:
+                restaurant["deliveryQuote"] = quotes[restaurant["_id"]]
+        if trim:
+            restaurants = [{key: value for key, value in restaurant.items() if key in fields} for restaurant in restaurants]
+        return CompressedBody(serialize_page(restaurants, next_cursor, model, truncated))
+    
+    # The version varies per quote window (and minute with open=true), so cached pages do too
+    cache_key = (version.version, fields, category, restaurant_query.search_tokens, open, near, min(limit, PAGE_SIZE_MAX), cursor)
+    body = await restaurants_cache.get_or_load(cache_key, load)
+    return compressed_response(request, body, version.headers)
+
+@router.get("/", response_model=Page[Restaurant])
+async def get_restaurants(
+    request: Request,
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    cursor: Optional[str] = None,
+    open: bool = False,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    fields: Optional[str] = None,
+    version: CollectionVersion = Depends(conditional_get("restaurants", variant=listing_variant)),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Get a page of restaurants, optionally filtered by category, search term or open now.
+
+    With `lat` and `lng`, only restaurants delivering to that point are
+    returned, nearest first, with their `distanceKm`. Every restaurant
+    carries a `deliveryQuote` with its current fee and ETA, priced for that
+    distance when known. `fields=name,rating` returns only those fields.
+    """
+    selected = sparse_fields(fields, Restaurant)
+    return await list_restaurants(
+        request, db, version, selected or RESTAURANT_FIELDS, None if selected else Restaurant,
+        category, search, limit, cursor, open, lat, lng
+    )
+
+@router.get("/summary", response_model=Page[RestaurantSummary])
+async def get_restaurant_summaries(
+    request: Request,
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    cursor: Optional[str] = None,
+    open: bool = False,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    version: CollectionVersion = Depends(conditional_get("restaurants", variant=listing_variant)),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Same listing as GET /, with only the fields a restaurant card shows"""
+    return await list_restaurants(
+        request, db, version, SUMMARY_FIELDS, RestaurantSummary,
+        category, search, limit, cursor, open, lat, lng
+    )
 
 @router.get("/{restaurant_id}", response_model=Restaurant)
-async def get_restaurant(restaurant_id: str):
+async def get_restaurant(
+    restaurant_id: str,
+    version: CollectionVersion = Depends(conditional_get("restaurants")),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
     """Get a specific restaurant by ID"""
     if not ObjectId.is_valid(restaurant_id):
         raise HTTPException(status_code=400, detail="Invalid restaurant ID")
     
-    restaurant = await db.restaurants.find_one({"_id": ObjectId(restaurant_id)})
+    restaurant = await db.restaurants.find_one({"_id": ObjectId(restaurant_id)}, RESTAURANT_PROJECTION)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
-    return Restaurant(**restaurant)
+    return JSONBytesResponse(serialize_document(restaurant, Restaurant), headers=version.headers)
+
+@router.get("/{restaurant_id}/detail", response_model=RestaurantDetail)
+async def get_restaurant_with_menu(restaurant_id: str, request: Request, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Get a restaurant and its whole menu grouped by category, for the detail page"""
+    if not ObjectId.is_valid(restaurant_id):
+        raise HTTPException(status_code=400, detail="Invalid restaurant ID")
+    
+    payload = await get_restaurant_detail(db, ObjectId(restaurant_id))
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    
+    check_not_modified(request, payload.version)
+    return compressed_response(request, payload.body, payload.version.headers)
 
 @router.post("/", response_model=Restaurant)
-async def create_restaurant(restaurant: RestaurantCreate):
+async def create_restaurant(restaurant: RestaurantCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
     """Create a new restaurant"""
     restaurant_dict = restaurant.dict()
     restaurant_dict["createdAt"] = restaurant_dict["updatedAt"] = datetime.utcnow()
+    restaurant_dict.update(derived_terms(restaurant_dict))
+    restaurant_dict["openIntervals"] = open_intervals(restaurant_dict["hours"])
+    restaurant_dict["location"] = restaurant_location(restaurant_dict["address"])
     
-    result = await db.restaurants.insert_one(restaurant_dict)
-    created_restaurant = await db.restaurants.find_one({"_id": result.inserted_id})
+    # insert_one sets restaurant_dict["_id"]; no need to read the document back
+    await db.restaurants.insert_one(restaurant_dict)
+    await bump_collection_version(db, "restaurants")
+    restaurants_cache.invalidate()
     
-    return Restaurant(**created_restaurant)
+    return Restaurant(**restaurant_dict)
 
 @router.put("/{restaurant_id}", response_model=Restaurant)
-async def update_restaurant(restaurant_id: str, restaurant_update: RestaurantUpdate):
+async def update_restaurant(restaurant_id: str, restaurant_update: RestaurantUpdate, db: AsyncIOMotorDatabase = Depends(get_database)):
     """Update a restaurant"""
     if not ObjectId.is_valid(restaurant_id):
         raise HTTPException(status_code=400, detail="Invalid restaurant ID")
     
     update_data = {k: v for k, v in restaurant_update.dict().items() if v is not None}
     update_data["updatedAt"] = datetime.utcnow()
+    # Hours and address are replaced whole, so what derives from them goes in the same $set
+    if "hours" in update_data:
+        update_data["openIntervals"] = open_intervals(update_data["hours"])
+    if "address" in update_data:
+        # None drops the restaurant from the geo index, which skips null locations
+        update_data["location"] = restaurant_location(update_data["address"])
     
-    result = await db.restaurants.update_one(
-        {"_id": ObjectId(restaurant_id)}, 
-        {"$set": update_data}
+    updated_restaurant = await db.restaurants.find_one_and_update(
+        {"_id": ObjectId(restaurant_id)},
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.matched_count == 0:
+    if updated_restaurant is None:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
-    updated_restaurant = await db.restaurants.find_one({"_id": ObjectId(restaurant_id)})
+    # Search and category terms combine several fields, so they are derived from the stored document
+    if touches_search_fields(update_data):
+        updated_restaurant.update(await sync_search_terms(db, updated_restaurant))
+    
+    await bump_collection_version(db, "restaurants")
+    restaurants_cache.invalidate()
+    invalidate_restaurant_detail(updated_restaurant["_id"])
     return Restaurant(**updated_restaurant)
 
 @router.delete("/{restaurant_id}")
-async def delete_restaurant(restaurant_id: str):
+async def delete_restaurant(restaurant_id: str, db: AsyncIOMotorDatabase = Depends(get_database)):
     """Delete a restaurant"""
     if not ObjectId.is_valid(restaurant_id):
         raise HTTPException(status_code=400, detail="Invalid restaurant ID")
@@ -91,13 +246,73 @@ async def delete_restaurant(restaurant_id: str):
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
+    await bump_collection_version(db, "restaurants")
+    restaurants_cache.invalidate()
+    invalidate_restaurant_detail(ObjectId(restaurant_id))
     return {"message": "Restaurant deleted successfully"}
 
-@router.get("/{restaurant_id}/menu", response_model=List[MenuItem])
-async def get_restaurant_menu(restaurant_id: str):
-    """Get menu items for a specific restaurant"""
+@router.get("/{restaurant_id}/menu", response_model=Page[MenuItem])
+async def get_restaurant_menu(
+    restaurant_id: str,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    version: CollectionVersion = Depends(conditional_get("menu_items")),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Get a page of menu items for a specific restaurant; `fields=name,price` returns only those fields"""
+    if not ObjectId.is_valid(restaurant_id):
+        raise HTTPException(status_code=400, detail="Invalid restaurant ID")
+    selected = sparse_fields(fields, MenuItem)
+    
+    menu_items, next_cursor = await paginate(
+        db.menu_items, {"restaurantId": ObjectId(restaurant_id)}, [("_id", 1)], limit, cursor,
+        projection=dict.fromkeys(selected, 1) if selected else MENU_ITEM_PROJECTION
+    )
+    body = serialize_page(menu_items, next_cursor, None if selected else MenuItem)
+    return JSONBytesResponse(body, headers=version.headers)
+
+@router.get("/{restaurant_id}/orders", response_model=Page[OrderResponse], dependencies=[Depends(require_staff)])
+async def get_restaurant_orders(
+    restaurant_id: str,
+    status: Optional[List[str]] = Query(None),
+    since: Optional[datetime] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    cursor: Optional[str] = None,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Get a page of a restaurant's order queue; staff only (X-Staff-Key).
+
+    Without `since`, returns orders in the given statuses (default: all not yet
+    delivered or cancelled), oldest first. With `since`, returns every order
+    changed at or after that time in change order, including ones that left
+    the queue, so tablets can poll with the latest updatedAt they have seen
+    and merge the results by id.
+    """
     if not ObjectId.is_valid(restaurant_id):
         raise HTTPException(status_code=400, detail="Invalid restaurant ID")
+    if status is not None and not set(status) <= ORDER_STATUSES:
+        raise HTTPException(status_code=400, detail="Invalid status")
     
-    menu_items = await db.menu_items.find({"restaurantId": ObjectId(restaurant_id)}).to_list(1000)
-    return [MenuItem(**item) for item in menu_items]
\ No newline at end of file
+    restaurant = await db.restaurants.find_one({"_id": ObjectId(restaurant_id)}, {"name": 1})
+    if not restaurant:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    
+    query = {"restaurantId": restaurant["_id"]}
+    if since is None:
+        query["status"] = {"$in": status or ACTIVE_ORDER_STATUSES}
+        sort = [("createdAt", 1), ("_id", 1)]
+    else:
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        query["updatedAt"] = {"$gte": since}
+        if status is not None:
+            query["status"] = {"$in": status}
+        sort = [("updatedAt", 1), ("_id", 1)]
+    
+    orders, next_cursor = await paginate(db.orders, query, sort, limit, cursor)
+    return Page(
+        items=[to_order_response(order, restaurant["name"]) for order in orders],
+        next_cursor=next_cursor
+    )
@@ -1,39 +1,26 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime, timedelta
-from models.user import User, UserCreate, UserLogin, UserUpdate, UserResponse, Token, UserAddress
-from services.auth import verify_password, get_password_hash, create_access_token, verify_token
-from config import MONGO_URL, DB_NAME
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from datetime import datetime
+from models.user import User, UserCreate, UserLogin, UserUpdate, UserResponse, Token, TokenRefresh, UserAddress
+from services.auth import (
+    verify_password_async,
+    get_password_hash_async,
+    create_user_tokens,
+    decode_token,
+    get_current_user,
+    invalidate_principal,
+    record_token_version,
+    REFRESH_TOKEN,
+)
+from database import get_database
 
 router = APIRouter(prefix="/api/users", tags=["users"])
-security = HTTPBearer()
-
-# MongoDB connection
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
-
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
-    email = verify_token(token)
-    if email is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    user = await db.users.find_one({"email": email})
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    return User(**user)
 
 @router.post("/register", response_model=Token)
-async def register_user(user: UserCreate):
+async def register_user(user: UserCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
     """Register a new user"""
     # Check if user already exists
     existing_user = await db.users.find_one({"email": user.email})
@@ -41,37 +28,66 @@ async def register_user(user: UserCreate):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash password and create user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     user_dict = user.dict()
     user_dict["password"] = hashed_password
+    user_dict["tokenVersion"] = 0
     user_dict["createdAt"] = user_dict["updatedAt"] = datetime.utcnow()
     
-    result = await db.users.insert_one(user_dict)
-    
-    # Create access token
-    access_token_expires = timedelta(minutes=30)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
+    # insert_one sets user_dict["_id"], which the tokens carry as `uid`
+    await db.users.insert_one(user_dict)
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return create_user_tokens(user_dict)
 
 @router.post("/login", response_model=Token)
-async def login_user(user_credentials: UserLogin):
+async def login_user(user_credentials: UserLogin, db: AsyncIOMotorDatabase = Depends(get_database)):
     """Login user"""
     user = await db.users.find_one({"email": user_credentials.email})
-    if not user or not verify_password(user_credentials.password, user["password"]):
+    if not user or not await verify_password_async(user_credentials.password, user["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
-    access_token_expires = timedelta(minutes=30)
-    access_token = create_access_token(
-        data={"sub": user["email"]}, expires_delta=access_token_expires
+    return create_user_tokens(user)
+
+@router.post("/refresh", response_model=Token)
+async def refresh_tokens(body: TokenRefresh, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Exchange a refresh token for a new token pair, without re-entering the password"""
+    claims = decode_token(body.refresh_token, REFRESH_TOKEN)
+    if claims is None or not ObjectId.is_valid(claims.get("uid", "")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+    
+    # Refresh tokens are long-lived, so revocation is always checked against the database
+    user = await db.users.find_one(
+        {"_id": ObjectId(claims["uid"])},
+        {"email": 1, "tokenVersion": 1}
+    )
+    if not user or user.get("tokenVersion", 0) != claims.get("ver", 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked"
+        )
+    
+    return create_user_tokens(user)
+
+@router.post("/logout")
+async def logout_user(current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Revoke every access and refresh token issued to the user so far"""
+    user = await db.users.find_one_and_update(
+        {"_id": current_user.id},
+        {"$inc": {"tokenVersion": 1}},
+        projection={"tokenVersion": 1},
+        return_document=ReturnDocument.AFTER
     )
+    if user:
+        record_token_version(current_user.id, user["tokenVersion"])
+    invalidate_principal(current_user.email)
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {"message": "Logged out successfully"}
 
 @router.get("/profile", response_model=UserResponse)
 async def get_user_profile(current_user: User = Depends(get_current_user)):
@@ -87,17 +103,20 @@ async def get_user_profile(current_user: User = Depends(get_current_user)):
     )
 
 @router.put("/profile", response_model=UserResponse)
-async def update_user_profile(user_update: UserUpdate, current_user: User = Depends(get_current_user)):
+async def update_user_profile(user_update: UserUpdate, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
     """Update user profile"""
     update_data = {k: v for k, v in user_update.dict().items() if v is not None}
     update_data["updatedAt"] = datetime.utcnow()
     
-    await db.users.update_one(
-        {"_id": current_user.id}, 
-        {"$set": update_data}
+    updated_user = await db.users.find_one_and_update(
+        {"_id": current_user.id},
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER
     )
     
-    updated_user = await db.users.find_one({"_id": current_user.id})
+    invalidate_principal(current_user.email)
+    if updated_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
     user_obj = User(**updated_user)
     
     return UserResponse(
@@ -111,7 +130,7 @@ async def update_user_profile(user_update: UserUpdate, current_user: User = Depe
     )
 
 @router.post("/addresses")
-async def add_user_address(address: UserAddress, current_user: User = Depends(get_current_user)):
+async def add_user_address(address: UserAddress, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
     """Add a new address for the user"""
     # If this is the first address or marked as default, make it default
     if not current_user.addresses or address.isDefault:
@@ -126,11 +145,12 @@ async def add_user_address(address: UserAddress, current_user: User = Depends(ge
         {"_id": current_user.id},
         {"$push": {"addresses": address.dict()}}
     )
+    invalidate_principal(current_user.email)
     
     return {"message": "Address added successfully"}
 
 @router.put("/addresses/{address_index}")
-async def update_user_address(address_index: int, address: UserAddress, current_user: User = Depends(get_current_user)):
+async def update_user_address(address_index: int, address: UserAddress, current_user: User = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_database)):
     """Update a user address"""
     if address_index >= len(current_user.addresses):
         raise HTTPException(status_code=404, detail="Address not found")
@@ -146,5 +166,6 @@ async def update_user_address(address_index: int, address: UserAddress, current_
         {"_id": current_user.id},
         {"$set": {f"addresses.{address_index}": address.dict()}}
     )
+    invalidate_principal(current_user.email)
     
     return {"message": "Address updated successfully"}
\ No newline at end of file
@@ -1,9 +1,25 @@
+"""
+Seed the database with sample data, or bulk import/export NDJSON:
+
+    python seed_data.py                                     # reset and seed sample data
+    python seed_data.py import restaurants restaurants.ndjson
+    python seed_data.py import menu_items menu.ndjson
+    python seed_data.py export menu_items [out.ndjson]      # stdout by default
+"""
 from motor.motor_asyncio import AsyncIOMotorClient
+import argparse
 import asyncio
+import json
 import os
+import sys
 from datetime import datetime
 from dotenv import load_dotenv
 from pathlib import Path
+from services.search import derived_terms
+from services.opening_hours import open_intervals
+from services.geo import restaurant_location
+from services.conditional import bump_collection_version
+from services.bulk import BULK_COLLECTIONS, export_ndjson, import_ndjson, iter_lines
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
@@ -45,13 +61,15 @@ async def seed_restaurants():
             "rating": 4.8,
             "deliveryTime": "25-35 min",
             "deliveryFee": 2.50,
+            "deliveryRadiusKm": 5.0,
             "isOpen": True,
             "promo": "Desconto de 20%",
             "categories": ["Tradicional", "Grelhados"],
             "address": {
                 "street": "Rua das Flores, 123",
                 "city": "Lisboa",
-                "postalCode": "1200-192"
+                "postalCode": "1200-192",
+                "coordinates": {"lat": 38.7095, "lng": -9.1465}
             },
             "contact": {
                 "phone": "+351 912 345 678",
@@ -72,13 +90,15 @@ async def seed_restaurants():
             "rating": 4.6,
             "deliveryTime": "30-40 min",
             "deliveryFee": 1.99,
+            "deliveryRadiusKm": 4.0,
             "isOpen": True,
             "promo": None,
             "categories": ["Pizza", "Massa"],
             "address": {
                 "street": "Avenida da República, 456",
                 "city": "Lisboa",
-                "postalCode": "1050-196"
+                "postalCode": "1050-196",
+                "coordinates": {"lat": 38.7405, "lng": -9.1455}
             },
             "contact": {
                 "phone": "+351 913 456 789",
@@ -99,13 +119,15 @@ async def seed_restaurants():
             "rating": 4.9,
             "deliveryTime": "40-50 min",
             "deliveryFee": 3.50,
+            "deliveryRadiusKm": 6.0,
             "isOpen": True,
             "promo": "Oferta: 2x1 em makis",
             "categories": ["Sushi", "Asiática"],
             "address": {
                 "street": "Rua do Ouro, 789",
                 "city": "Lisboa",
-                "postalCode": "1100-061"
+                "postalCode": "1100-061",
+                "coordinates": {"lat": 38.711, "lng": -9.1375}
             },
             "contact": {
                 "phone": "+351 914 567 890",
@@ -126,13 +148,15 @@ async def seed_restaurants():
             "rating": 4.4,
             "deliveryTime": "20-30 min",
             "deliveryFee": 1.50,
+            "deliveryRadiusKm": 3.0,
             "isOpen": False,
             "promo": None,
             "categories": ["Fast Food", "Hambúrgueres"],
             "address": {
                 "street": "Largo do Chiado, 12",
                 "city": "Lisboa",
-                "postalCode": "1200-108"
+                "postalCode": "1200-108",
+                "coordinates": {"lat": 38.7107, "lng": -9.1422}
             },
             "contact": {
                 "phone": "+351 915 678 901",
@@ -153,13 +177,15 @@ async def seed_restaurants():
             "rating": 4.7,
             "deliveryTime": "35-45 min",
             "deliveryFee": 2.00,
+            "deliveryRadiusKm": 5.0,
             "isOpen": True,
             "promo": "Entrega grátis",
             "categories": ["Tradicional", "Caseira"],
             "address": {
                 "street": "Travessa do Fado, 34",
                 "city": "Lisboa",
-                "postalCode": "1170-145"
+                "postalCode": "1170-145",
+                "coordinates": {"lat": 38.715, "lng": -9.129}
             },
             "contact": {
                 "phone": "+351 916 789 012",
@@ -178,6 +204,11 @@ async def seed_restaurants():
     await db.restaurants.delete_many({})
     
     # Insert restaurants and get their IDs
+    for restaurant in restaurants:
+        restaurant.update(derived_terms(restaurant))
+        restaurant["openIntervals"] = open_intervals(restaurant["hours"])
+        restaurant["location"] = restaurant_location(restaurant["address"])
+    
     result = await db.restaurants.insert_many(restaurants)
     restaurant_ids = result.inserted_ids
     print("Restaurants seeded successfully!")
@@ -284,8 +315,52 @@ async def main():
     restaurant_ids = await seed_restaurants()
     await seed_menu_items(restaurant_ids)
     
+    # Invalidate ETags served for the previous catalog
+    for collection in ("categories", "restaurants", "menu_items"):
+        await bump_collection_version(db, collection)
+    
     print("Database seeding completed!")
     client.close()
 
+async def read_chunks(path: str, size: int = 1 << 16):
+    with open(path, "rb") as f:
+        while chunk := f.read(size):
+            yield chunk
+
+async def import_file(collection: str, path: str):
+    """Import an NDJSON file and print the report"""
+    try:
+        report = await import_ndjson(db, collection, iter_lines(read_chunks(path)))
+    finally:
+        client.close()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 1 if report["failed"] else 0
+
+async def export_file(collection: str, path: str = None):
+    out = open(path, "wb") if path else sys.stdout.buffer
+    try:
+        async for line in export_ndjson(db, collection):
+            out.write(line)
+    finally:
+        if path:
+            out.close()
+        client.close()
+    return 0
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Seed, import or export catalog data")
+    commands = parser.add_subparsers(dest="command")
+    import_parser = commands.add_parser("import", help="insert documents from an NDJSON file")
+    import_parser.add_argument("collection", choices=sorted(BULK_COLLECTIONS))
+    import_parser.add_argument("path")
+    export_parser = commands.add_parser("export", help="write a collection as NDJSON")
+    export_parser.add_argument("collection", choices=sorted(BULK_COLLECTIONS))
+    export_parser.add_argument("path", nargs="?")
+    args = parser.parse_args()
+    
+    if args.command == "import":
+        sys.exit(asyncio.run(import_file(args.collection, args.path)))
+    elif args.command == "export":
+        sys.exit(asyncio.run(export_file(args.collection, args.path)))
+    else:
+        asyncio.run(main())
\ No newline at end of file
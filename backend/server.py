@@ -1,8 +1,21 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Depends
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from contextlib import asynccontextmanager
+import asyncio
 import logging
-from config import MONGO_URL, DB_NAME
+from database import connect_to_mongo, close_mongo_connection, get_database, database
+from indexes import ensure_indexes
+from models.restaurant import RestaurantCreate
+from models.menu_item import MenuItemCreate
+from services.search import backfill_search_terms
+from services.cache import cache_stats
+from services.serialization import ORJSONResponse, backfill_defaults
+from services.compression import CompressionMiddleware
+from services.auth import password_hashing_pool, token_revocations
+from services.restaurant_query import query_cache_info
+from services.order_events import order_events
+from services.opening_hours import refresh_open_intervals_periodically
 
 # Import routes
 from routes.restaurants import router as restaurants_router
@@ -10,13 +23,43 @@ from routes.categories import router as categories_router
 from routes.menu_items import router as menu_items_router
 from routes.users import router as users_router
 from routes.orders import router as orders_router
+from routes.bulk import router as bulk_router
 
-# MongoDB connection
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await connect_to_mongo()
+    await ensure_indexes(database.db)
+    backfilled = await backfill_search_terms(database.db)
+    if backfilled:
+        logger.info(f"Indexed {backfilled} restaurants for search")
+    for collection, model in ((database.db.restaurants, RestaurantCreate), (database.db.menu_items, MenuItemCreate)):
+        backfilled = await backfill_defaults(collection, model)
+        if backfilled:
+            logger.info(f"Filled in defaults on {backfilled} {collection.name}")
+    await order_events.start(database.db)
+    # First run backfills restaurants created before open intervals existed
+    opening_hours_task = asyncio.create_task(refresh_open_intervals_periodically(database.db))
+    logger.info("Vizinhando API started successfully!")
+    yield
+    opening_hours_task.cancel()
+    await order_events.stop()
+    await close_mongo_connection()
+    password_hashing_pool.shutdown()
 
 # Create the main app
-app = FastAPI(title="Vizinhando API", version="1.0.0")
+app = FastAPI(
+    title="Vizinhando API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # Include routers
 app.include_router(restaurants_router)
@@ -24,6 +67,7 @@ app.include_router(categories_router)
 app.include_router(menu_items_router)
 app.include_router(users_router)
 app.include_router(orders_router)
+app.include_router(bulk_router)
 
 # Original API endpoints for compatibility
 api_router = APIRouter(prefix="/api")
@@ -32,9 +76,32 @@ api_router = APIRouter(prefix="/api")
 async def root():
     return {"message": "Vizinhando API is running!"}
 
+@api_router.get("/health")
+async def health(db: AsyncIOMotorDatabase = Depends(get_database)):
+    """Report database reachability and connection pool usage"""
+    try:
+        await db.command("ping")
+        mongo_status = "ok"
+    except Exception as e:
+        logger.warning(f"Health check ping failed: {e}")
+        mongo_status = "unavailable"
+    
+    return {
+        "status": "ok" if mongo_status == "ok" else "degraded",
+        "mongo": mongo_status,
+        "pool": database.pool_monitor.stats(),
+        "caches": cache_stats(),
+        "restaurantQueryCache": query_cache_info(),
+        "passwordHashing": password_hashing_pool.stats(),
+        "tokenRevocations": token_revocations.stats(),
+        "orderEvents": order_events.stats()
+    }
+
 # Include the compatibility router
 app.include_router(api_router)
 
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -42,18 +109,3 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-@app.on_event("startup")
-async def startup_db_client():
-    logger.info("Vizinhando API started successfully!")
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
@@ -1,8 +1,30 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import NamedTuple, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import Depends, HTTPException, Query, status
+from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+import asyncio
+import secrets
+import time
+from models.user import User
+from database import get_database
+from services.cache import register_cache, MISSING
+from config import (
+    SECRET_KEY,
+    ALGORITHM,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_QUEUE,
+    PRINCIPAL_CACHE_TTL_SECONDS,
+    PRINCIPAL_CACHE_MAX_ENTRIES,
+    STAFF_API_KEY,
+)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -12,6 +34,73 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+class PasswordHashingPool:
+    """
+    Runs bcrypt on a bounded thread pool so a burst of logins cannot block the
+    event loop. bcrypt releases the GIL, so the threads hash in parallel.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = asyncio.Semaphore(workers)
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def run(self, func, *args):
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, please retry",
+                headers={"Retry-After": "1"},
+            )
+        
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queueDepth": self.queued,
+            "maxQueue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+password_hashing_pool = PasswordHashingPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
+
+async def verify_password_async(plain_password, hashed_password):
+    return await password_hashing_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await password_hashing_pool.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -22,12 +111,194 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+def create_user_tokens(user: dict) -> dict:
+    """
+    Issue an access/refresh token pair for a user document.
+
+    Both carry the user id (`uid`) and token version (`ver`), so order
+    endpoints can authorize without reading the users collection.
+    """
+    claims = {"sub": user["email"], "uid": str(user["_id"]), "ver": user.get("tokenVersion", 0)}
+    return {
+        "access_token": create_access_token(
+            {**claims, "type": ACCESS_TOKEN}, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        ),
+        "refresh_token": create_access_token(
+            {**claims, "type": REFRESH_TOKEN}, timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        ),
+        "token_type": "bearer",
+    }
+
+# Decoded claims per raw token, so polling clients skip signature checks
+token_claims_cache = register_cache("token_claims", PRINCIPAL_CACHE_MAX_ENTRIES, PRINCIPAL_CACHE_TTL_SECONDS)
+# Users per token subject, so authenticated requests skip the users lookup
+principals_cache = register_cache("principals", PRINCIPAL_CACHE_MAX_ENTRIES, PRINCIPAL_CACHE_TTL_SECONDS)
+class TokenRevocations:
+    """
+    Lowest still-valid token version per user id, as last seen by this process.
+
+    An entry has to outlive every access token it rejects, so it is kept for
+    ACCESS_TOKEN_EXPIRE_MINUTES after it was recorded and is never evicted for
+    size; expired entries are pruned as new ones come in. Only users whose
+    version was ever bumped (by logging out) have an entry.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # Every entry lives `ttl` from its last record, so this order is expiry order
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+
+    def record(self, user_id: str, version: int):
+        now = time.monotonic()
+        while self._entries and next(iter(self._entries.values()))[1] <= now:
+            self._entries.popitem(last=False)
+        if version > 0:
+            self._entries[user_id] = (version, now + self.ttl)
+            self._entries.move_to_end(user_id)
+
+    def is_revoked(self, user_id: str, version: int) -> bool:
+        entry = self._entries.get(user_id)
+        return entry is not None and entry[1] > time.monotonic() and version < entry[0]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "ttlSeconds": self.ttl}
+
+token_revocations = TokenRevocations(ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+def decode_token(token: str, token_type: str = ACCESS_TOKEN) -> Optional[dict]:
+    """Verify and decode `token`, memoized per token until it expires"""
+    claims = token_claims_cache.get(token)
+    if claims is MISSING:
+        try:
+            claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
             return None
-        return email
-    except JWTError:
-        return None
\ No newline at end of file
+        token_claims_cache.set(token, claims)
+    elif claims.get("exp") is not None and claims["exp"] <= time.time():
+        token_claims_cache.invalidate(token)
+        return None
+    
+    # Tokens issued before refresh tokens existed have no type and are access tokens
+    if claims.get("type", ACCESS_TOKEN) != token_type:
+        return None
+    return claims
+
+def verify_token(token: str):
+    claims = decode_token(token)
+    if claims is None:
+        return None
+    return claims.get("sub")
+
+def invalidate_principal(email: str):
+    """Drop the cached user after a profile or address change"""
+    principals_cache.invalidate(email)
+
+def record_token_version(user_id: ObjectId, version: int):
+    """Note a user's current token version; tokens with an older one are revoked"""
+    token_revocations.record(str(user_id), version)
+
+def _unauthorized(detail: str = "Invalid authentication credentials") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+security = HTTPBearer()
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+) -> User:
+    """Resolve the authenticated user from the bearer token"""
+    claims = decode_token(credentials.credentials)
+    if claims is None or claims.get("sub") is None:
+        raise _unauthorized()
+    
+    email = claims["sub"]
+    user = principals_cache.get(email)
+    if user is MISSING:
+        document = await db.users.find_one({"email": email})
+        if document is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+        user = User(**document)
+        principals_cache.set(email, user)
+        record_token_version(user.id, user.tokenVersion)
+    
+    if "ver" in claims and claims["ver"] != user.tokenVersion:
+        raise _unauthorized("Token has been revoked")
+    return user
+
+class Principal(NamedTuple):
+    id: ObjectId
+    email: str
+    version: int
+
+async def _principal_from_token(token: str, db: AsyncIOMotorDatabase) -> Principal:
+    claims = decode_token(token)
+    if claims is None or claims.get("sub") is None:
+        raise _unauthorized()
+    
+    uid = claims.get("uid")
+    if uid is None or not ObjectId.is_valid(uid):
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        user = await get_current_user(credentials, db)
+        return Principal(user.id, user.email, user.tokenVersion)
+    
+    principal = Principal(ObjectId(uid), claims["sub"], claims.get("ver", 0))
+    # Versions only grow, so an older token than the one recorded is revoked
+    if token_revocations.is_revoked(uid, principal.version):
+        raise _unauthorized("Token has been revoked")
+    return principal
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+) -> Principal:
+    """
+    Identify the caller from token claims alone, without reading users.
+
+    A logout is enforced at once by the worker that handled it. Other
+    workers reject the revoked access tokens once they load that user
+    (get_current_user, e.g. on /users/profile); until then they accept them
+    until they expire, at most ACCESS_TOKEN_EXPIRE_MINUTES after issue.
+    Refresh tokens are always checked against the database. Tokens without
+    a `uid` claim fall back to get_current_user.
+    """
+    return await _principal_from_token(credentials.credentials, db)
+
+optional_security = HTTPBearer(auto_error=False)
+
+async def get_stream_principal(
+    access_token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+) -> Principal:
+    """
+    get_current_principal for event streams.
+
+    Browsers' EventSource can't set headers, so the token may also be passed
+    as the `access_token` query parameter.
+    """
+    token = credentials.credentials if credentials is not None else access_token
+    if token is None:
+        raise _unauthorized("Not authenticated")
+    return await _principal_from_token(token, db)
+
+staff_key_header = APIKeyHeader(name="X-Staff-Key", auto_error=False)
+
+async def require_staff(staff_key: Optional[str] = Depends(staff_key_header)):
+    """Guard for restaurant staff endpoints, which expose customer details"""
+    if STAFF_API_KEY is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Staff access is not configured")
+    if staff_key is None or not secrets.compare_digest(staff_key, STAFF_API_KEY):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid staff key")
@@ -0,0 +1,173 @@
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+import orjson
+from models.restaurant import Restaurant, RestaurantCreate
+from models.menu_item import MenuItem, MenuItemCreate
+from services.search import derived_terms
+from services.opening_hours import open_intervals
+from services.geo import restaurant_location
+from services.cache import restaurants_cache, restaurant_details_cache
+from services.conditional import bump_collection_version
+from services.serialization import dumps, model_projection
+from config import BULK_BATCH_SIZE, BULK_MAX_REPORTED_ERRORS
+
+class RowError(Exception):
+    """A row that can't be imported; reported with its line number"""
+
+class BulkCollection(NamedTuple):
+    collection: str
+    create_model: Type[BaseModel]
+    model: Type[BaseModel]
+    # Turns a batch of validated rows into documents, or a RowError per rejected row
+    prepare: Callable[[AsyncIOMotorDatabase, List[Tuple[int, dict]]], Awaitable[List[Tuple[int, object]]]]
+
+async def _prepare_restaurants(db: AsyncIOMotorDatabase, rows: List[Tuple[int, dict]]) -> List[Tuple[int, object]]:
+    now = datetime.utcnow()
+    prepared = []
+    for line, restaurant in rows:
+        restaurant["createdAt"] = restaurant["updatedAt"] = now
+        restaurant.update(derived_terms(restaurant))
+        restaurant["openIntervals"] = open_intervals(restaurant["hours"])
+        restaurant["location"] = restaurant_location(restaurant["address"])
+        prepared.append((line, restaurant))
+    return prepared
+
+async def _prepare_menu_items(db: AsyncIOMotorDatabase, rows: List[Tuple[int, dict]]) -> List[Tuple[int, object]]:
+    """Check every restaurantId in the batch with a single $in lookup"""
+    ids = {ObjectId(item["restaurantId"]) for _, item in rows if ObjectId.is_valid(item["restaurantId"])}
+    existing = set()
+    if ids:
+        existing = {
+            restaurant["_id"]
+            for restaurant in await db.restaurants.find({"_id": {"$in": list(ids)}}, {"_id": 1}).to_list(None)
+        }
+
+    now = datetime.utcnow()
+    prepared = []
+    for line, item in rows:
+        if not ObjectId.is_valid(item["restaurantId"]):
+            prepared.append((line, RowError("Invalid restaurantId")))
+            continue
+        item["restaurantId"] = ObjectId(item["restaurantId"])
+        if item["restaurantId"] not in existing:
+            prepared.append((line, RowError("Restaurant not found")))
+            continue
+        item["createdAt"] = item["updatedAt"] = now
+        prepared.append((line, item))
+    return prepared
+
+BULK_COLLECTIONS: Dict[str, BulkCollection] = {
+    "restaurants": BulkCollection("restaurants", RestaurantCreate, Restaurant, _prepare_restaurants),
+    "menu_items": BulkCollection("menu_items", MenuItemCreate, MenuItem, _prepare_menu_items),
+}
+
+def get_bulk_collection(name: str) -> BulkCollection:
+    spec = BULK_COLLECTIONS.get(name)
+    if spec is None:
+        raise HTTPException(status_code=404, detail=f"Bulk import/export is not available for {name}")
+    return spec
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without buffering more than one partial line"""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def error(self, line: int, message: str):
+        self.failed += 1
+        if len(self.errors) < BULK_MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def dict(self) -> dict:
+        return {"inserted": self.inserted, "failed": self.failed, "errors": self.errors}
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+async def _flush(db: AsyncIOMotorDatabase, spec: BulkCollection, rows: List[Tuple[int, dict]], report: ImportReport):
+    documents, lines = [], []
+    for line, document in await spec.prepare(db, rows):
+        if isinstance(document, RowError):
+            report.error(line, str(document))
+        else:
+            documents.append(document)
+            lines.append(line)
+    if not documents:
+        return
+
+    try:
+        result = await db[spec.collection].insert_many(documents, ordered=False)
+        report.inserted += len(result.inserted_ids)
+    except BulkWriteError as e:
+        # Unordered: every document without a write error was still inserted
+        failed = {error["index"]: error.get("errmsg", "Write error") for error in e.details.get("writeErrors", [])}
+        report.inserted += e.details.get("nInserted", len(documents) - len(failed))
+        for index, message in failed.items():
+            report.error(lines[index], message)
+
+async def import_ndjson(db: AsyncIOMotorDatabase, name: str, lines: AsyncIterable[bytes]) -> dict:
+    """
+    Validate and insert one document per NDJSON line.
+
+    Rows are validated against the collection's create model and inserted in
+    unordered batches of BULK_BATCH_SIZE, so one bad row never blocks the rest.
+    Returns counts plus per-row errors keyed by 1-based line number.
+    """
+    spec = get_bulk_collection(name)
+    report = ImportReport()
+    batch: List[Tuple[int, dict]] = []
+    line_number = 0
+
+    async for raw in lines:
+        line_number += 1
+        if not raw.strip():
+            continue
+        try:
+            row = spec.create_model.model_validate(orjson.loads(raw)).model_dump()
+        except orjson.JSONDecodeError:
+            report.error(line_number, "Invalid JSON")
+            continue
+        except ValidationError as e:
+            report.error(line_number, _validation_message(e))
+            continue
+
+        batch.append((line_number, row))
+        if len(batch) >= BULK_BATCH_SIZE:
+            await _flush(db, spec, batch, report)
+            batch = []
+    if batch:
+        await _flush(db, spec, batch, report)
+
+    if report.inserted:
+        await bump_collection_version(db, spec.collection)
+        if spec.collection == "restaurants":
+            restaurants_cache.invalidate()
+        else:
+            restaurant_details_cache.invalidate()
+    return report.dict()
+
+async def export_ndjson(db: AsyncIOMotorDatabase, name: str, query: Optional[dict] = None) -> AsyncIterator[bytes]:
+    """Stream a collection as NDJSON, one cursor batch in memory at a time"""
+    spec = get_bulk_collection(name)
+    cursor = db[spec.collection].find(query or {}, model_projection(spec.model)).sort("_id", 1).batch_size(BULK_BATCH_SIZE)
+    async for document in cursor:
+        yield dumps(document) + b"\n"
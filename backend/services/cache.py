@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import time
+from config import CATALOG_CACHE_TTL_SECONDS, CATALOG_CACHE_MAX_ENTRIES
+
+MISSING = object()
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after `ttl` seconds.
+
+    The cache is per process: handlers clear it on writes, and the TTL bounds
+    how long other workers can serve data that changed elsewhere.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable = MISSING):
+        """Drop one entry, or every entry when no key is given"""
+        if key is MISSING:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+        self.invalidations += 1
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]):
+        """Drop every entry whose key satisfies `predicate`"""
+        for key in [key for key in self._entries if predicate(key)]:
+            del self._entries[key]
+        self.invalidations += 1
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Read-through: return the cached value or await `loader` and cache its result"""
+        value = self.get(key)
+        if value is MISSING:
+            value = await loader()
+            self.set(key, value)
+        return value
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "maxSize": self.maxsize,
+            "ttlSeconds": self.ttl,
+        }
+
+CACHES: Dict[str, TTLCache] = {}
+
+def register_cache(name: str, maxsize: int = CATALOG_CACHE_MAX_ENTRIES, ttl: float = CATALOG_CACHE_TTL_SECONDS) -> TTLCache:
+    cache = TTLCache(name, maxsize, ttl)
+    CACHES[name] = cache
+    return cache
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+categories_cache = register_cache("categories")
+restaurants_cache = register_cache("restaurants")
+# Pre-serialized restaurant-plus-menu payloads, per restaurant _id and collection versions
+restaurant_details_cache = register_cache("restaurant_details")
@@ -0,0 +1,148 @@
+"""
+gzip/brotli response compression.
+
+CompressionMiddleware compresses complete responses above COMPRESSION_MIN_SIZE
+for clients that accept it. Cached catalog payloads are wrapped in
+CompressedBody, which keeps each encoding it has produced, so the hot path
+serves stored bytes instead of recompressing the same page per request.
+The middleware leaves those, and streaming responses (order events, NDJSON
+exports), untouched. brotli is optional; without it only gzip is offered.
+"""
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from functools import lru_cache
+from typing import Dict, Optional
+import gzip
+from services.serialization import JSONBytesResponse
+from config import (
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_BROTLI_QUALITY,
+    PRECOMPRESSED_GZIP_LEVEL,
+    PRECOMPRESSED_BROTLI_QUALITY,
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred first when a client accepts several
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Event streams must reach the client as each event is written
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+@lru_cache(maxsize=256)
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The preferred supported coding in an Accept-Encoding header; None means identity"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    for coding in ENCODINGS:
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+def compress(body: bytes, encoding: str, precompressed: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=PRECOMPRESSED_BROTLI_QUALITY if precompressed else COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=PRECOMPRESSED_GZIP_LEVEL if precompressed else COMPRESSION_GZIP_LEVEL, mtime=0)
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return (
+        content_type is not None
+        and content_type.startswith(COMPRESSIBLE_TYPES)
+        and not content_type.startswith(UNCOMPRESSED_TYPES)
+    )
+
+class CompressedBody:
+    """Encoded JSON plus its compressed forms, each built on first request and kept"""
+
+    __slots__ = ("body", "_encoded")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._encoded: Dict[str, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self.body)
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding is None or len(self.body) < COMPRESSION_MIN_SIZE:
+            return self.body
+        encoded = self._encoded.get(encoding)
+        if encoded is None:
+            encoded = self._encoded[encoding] = compress(self.body, encoding, precompressed=True)
+        return encoded
+
+def compressed_response(request: Request, payload: CompressedBody, headers: Optional[dict] = None) -> JSONBytesResponse:
+    """Respond with the stored encoding of `payload` the client prefers"""
+    encoding = None
+    if len(payload) >= COMPRESSION_MIN_SIZE:
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return JSONBytesResponse(payload.encoded(encoding), headers=headers)
+
+class CompressionMiddleware:
+    """
+    Compress single-body responses of at least `minimum_size` bytes.
+
+    Responses that already have a Content-Encoding, aren't text or JSON, or
+    stream their body in several messages are passed through as they are.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+
+        async def send_compressed(message: Message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not is_compressible(headers.get("content-type")):
+                    await send(message)
+                else:
+                    # Held back until the body shows whether it is complete and large enough
+                    start = message
+                return
+            if start is None:
+                await send(message)
+                return
+
+            response_start, start = start, None
+            headers = MutableHeaders(raw=response_start["headers"])
+            body = message.get("body", b"")
+            if not message.get("more_body", False) and len(body) >= self.minimum_size:
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                message = {**message, "body": body}
+            await send(response_start)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,117 @@
+from fastapi import Depends, HTTPException, Request, Response
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from bson import ObjectId
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, NamedTuple, Optional
+import hashlib
+from database import get_database
+from services.cache import register_cache, MISSING
+from config import COLLECTION_VERSION_TTL_SECONDS
+
+class CollectionVersion(NamedTuple):
+    version: str
+    updatedAt: datetime
+
+    @property
+    def etag(self) -> str:
+        return f'W/"{self.version}"'
+
+    @property
+    def last_modified(self) -> str:
+        return format_datetime(self.updatedAt.replace(tzinfo=timezone.utc), usegmt=True)
+
+    def varied(self, at: Optional[datetime]) -> "CollectionVersion":
+        """This version combined with a point in time, for responses that also change with the clock"""
+        if at is None:
+            return self
+        return CollectionVersion(f"{self.version}-{int(at.replace(tzinfo=timezone.utc).timestamp())}", max(self.updatedAt, at))
+
+    @property
+    def headers(self) -> dict:
+        """Validator headers; handlers returning a Response directly must pass these on"""
+        return {
+            "ETag": self.etag,
+            "Last-Modified": self.last_modified,
+            "Cache-Control": "no-cache",
+        }
+
+# Versions are shared by all workers through the collection_versions
+# collection; this memo only saves the lookup on back-to-back requests.
+versions_cache = register_cache("collection_versions", ttl=COLLECTION_VERSION_TTL_SECONDS)
+
+async def get_collection_version(db: AsyncIOMotorDatabase, collection: str) -> CollectionVersion:
+    version = versions_cache.get(collection)
+    if version is not MISSING:
+        return version
+
+    document = await db.collection_versions.find_one({"_id": collection})
+    if document is None:
+        # First read of a collection never written through the API; $setOnInsert
+        # keeps whichever version a concurrent request or write stored first
+        now = datetime.utcnow().replace(microsecond=0)
+        document = await db.collection_versions.find_one_and_update(
+            {"_id": collection},
+            {"$setOnInsert": {"version": str(ObjectId()), "updatedAt": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    version = CollectionVersion(document["version"], document["updatedAt"])
+    versions_cache.set(collection, version)
+    return version
+
+async def bump_collection_version(db: AsyncIOMotorDatabase, collection: str):
+    """Record a write to `collection`, changing the validators of its GET endpoints"""
+    await db.collection_versions.update_one(
+        {"_id": collection},
+        {"$set": {"version": str(ObjectId()), "updatedAt": datetime.utcnow().replace(microsecond=0)}},
+        upsert=True
+    )
+    versions_cache.invalidate(collection)
+
+def payload_version(body: bytes, updated_at: datetime) -> CollectionVersion:
+    """Validators for one cached payload: a hash of its bytes and when it was built"""
+    return CollectionVersion(hashlib.blake2b(body, digest_size=12).hexdigest(), updated_at.replace(microsecond=0))
+
+def check_not_modified(request: Request, version: CollectionVersion):
+    """Answer 304 when the client's validators still match `version`"""
+    if _is_not_modified(request, version):
+        raise HTTPException(status_code=304, headers=version.headers)
+
+def _is_not_modified(request: Request, version: CollectionVersion) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        return "*" in candidates or version.etag in candidates or version.etag[2:] in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return version.updatedAt.replace(tzinfo=timezone.utc) <= since
+    return False
+
+def conditional_get(collection: str, variant: Optional[Callable[[Request], Optional[datetime]]] = None):
+    """
+    Dependency emitting ETag/Last-Modified for a GET backed by `collection`.
+
+    Answers 304 before the handler runs when the client's validators still
+    match, skipping both the query and the serialization. Otherwise returns
+    the current CollectionVersion so handlers can key caches on it.
+    `variant` maps a request whose result also depends on the time to the
+    naive-UTC start of its current time bucket.
+    """
+    async def dependency(request: Request, response: Response, db: AsyncIOMotorDatabase = Depends(get_database)) -> CollectionVersion:
+        version = await get_collection_version(db, collection)
+        if variant is not None:
+            version = version.varied(variant(request))
+        check_not_modified(request, version)
+        response.headers.update(version.headers)
+        return version
+    return dependency
@@ -0,0 +1,139 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+import time
+from services.cache import register_cache, MISSING
+from services.opening_hours import restaurant_zone
+from config import (
+    DELIVERY_QUOTE_TTL_SECONDS,
+    DELIVERY_QUOTE_MAX_ENTRIES,
+    DELIVERY_INCLUDED_KM,
+    DELIVERY_FEE_PER_KM,
+    DELIVERY_PEAK_SURCHARGE,
+    DEFAULT_DELIVERY_DISTANCE_KM,
+)
+
+# Local hours [start, end) with lunch and dinner rush pricing and slower roads
+PEAK_HOURS = ((12, 14), (19, 21))
+PEAK_TRAVEL_FACTOR = 1.25
+
+BASE_PREPARATION_MINUTES = 12
+MINUTES_PER_PREPARING_ORDER = 3
+COURIER_SPEED_KMH = 18
+# Width of the "25-35 min" range shown to customers
+ETA_WINDOW_MINUTES = 10
+
+# Restaurant fields compute_quote reads
+QUOTE_PROJECTION = {"deliveryFee": 1, "hours.timezone": 1}
+
+# Orders counted as kitchen load when quoting
+LOAD_STATUSES = ["preparing"]
+
+# Orders preparing per restaurant, and finished quotes, shared by every row
+# and request within the window
+restaurant_loads_cache = register_cache("restaurant_loads", DELIVERY_QUOTE_MAX_ENTRIES, DELIVERY_QUOTE_TTL_SECONDS)
+delivery_quotes_cache = register_cache("delivery_quotes", DELIVERY_QUOTE_MAX_ENTRIES, DELIVERY_QUOTE_TTL_SECONDS)
+
+def quote_window(now: Optional[float] = None) -> int:
+    """Index of the current memoization window; quotes change only between windows"""
+    return int((now or time.time()) // DELIVERY_QUOTE_TTL_SECONDS)
+
+def quote_window_start(now: Optional[float] = None) -> datetime:
+    """Naive-UTC start of the current window, for conditional_get variants"""
+    start = quote_window(now) * DELIVERY_QUOTE_TTL_SECONDS
+    return datetime.fromtimestamp(start, timezone.utc).replace(tzinfo=None)
+
+def is_peak(restaurant: dict, now: datetime) -> bool:
+    hour = now.astimezone(restaurant_zone((restaurant.get("hours") or {}).get("timezone"))).hour
+    return any(start <= hour < end for start, end in PEAK_HOURS)
+
+def compute_quote(restaurant: dict, distance_km: Optional[float], load: int, now: datetime) -> dict:
+    """
+    Fee and ETA for one restaurant, shaped like models.restaurant.DeliveryQuote.
+
+    The fee is the restaurant's base deliveryFee plus DELIVERY_FEE_PER_KM beyond
+    DELIVERY_INCLUDED_KM, plus DELIVERY_PEAK_SURCHARGE at rush hour. The ETA is
+    preparation time, growing with the orders already preparing, plus travel
+    time at courier speed, slower at rush hour. Without a known distance the
+    fee is the base fee and travel assumes DEFAULT_DELIVERY_DISTANCE_KM.
+    """
+    peak = is_peak(restaurant, now)
+    fee = restaurant.get("deliveryFee", 0.0)
+    if distance_km is not None:
+        fee += max(0.0, distance_km - DELIVERY_INCLUDED_KM) * DELIVERY_FEE_PER_KM
+    if peak:
+        fee += DELIVERY_PEAK_SURCHARGE
+
+    travel_km = distance_km if distance_km is not None else DEFAULT_DELIVERY_DISTANCE_KM
+    travel_minutes = travel_km / COURIER_SPEED_KMH * 60 * (PEAK_TRAVEL_FACTOR if peak else 1)
+    eta = BASE_PREPARATION_MINUTES + load * MINUTES_PER_PREPARING_ORDER + travel_minutes
+    # Round up to 5 minutes so the shown range doesn't flicker
+    low = int(-(-eta // 5) * 5)
+    return {"fee": round(fee, 2), "etaMinutes": low, "deliveryTime": f"{low}-{low + ETA_WINDOW_MINUTES} min"}
+
+async def restaurant_loads(db: AsyncIOMotorDatabase, restaurant_ids: Iterable) -> Dict:
+    """Orders in LOAD_STATUSES per restaurant; uncached ids are counted in one aggregation"""
+    loads, missing = {}, []
+    for restaurant_id in set(restaurant_ids):
+        load = restaurant_loads_cache.get(restaurant_id)
+        if load is MISSING:
+            missing.append(restaurant_id)
+        else:
+            loads[restaurant_id] = load
+
+    if missing:
+        counted = {
+            row["_id"]: row["count"]
+            async for row in db.orders.aggregate([
+                {"$match": {"restaurantId": {"$in": missing}, "status": {"$in": LOAD_STATUSES}}},
+                {"$group": {"_id": "$restaurantId", "count": {"$sum": 1}}},
+            ])
+        }
+        for restaurant_id in missing:
+            loads[restaurant_id] = counted.get(restaurant_id, 0)
+            restaurant_loads_cache.set(restaurant_id, loads[restaurant_id])
+    return loads
+
+async def quote_restaurants(
+    db: AsyncIOMotorDatabase,
+    restaurants: List[dict],
+    distances: Optional[Dict] = None,
+    now: Optional[datetime] = None,
+) -> Dict:
+    """
+    Quote per restaurant _id for a page of restaurant documents.
+
+    Quotes are memoized per (restaurant, its base fee and timezone, distance
+    to 100 m, window), so restaurant edits apply at once, and are shared
+    between requests, so treat them as read-only. A 500-row listing costs at
+    most one load aggregation and is otherwise served from memory until the
+    window rolls over.
+    """
+    now = now or datetime.now(timezone.utc)
+    window = quote_window(now.timestamp())
+    distances = distances or {}
+
+    quotes, pending = {}, []
+    for restaurant in restaurants:
+        distance = distances.get(restaurant["_id"])
+        key = (
+            restaurant["_id"],
+            restaurant.get("deliveryFee"),
+            (restaurant.get("hours") or {}).get("timezone"),
+            None if distance is None else round(distance, 1),
+            window,
+        )
+        quote = delivery_quotes_cache.get(key)
+        if quote is MISSING:
+            pending.append((key, restaurant, distance))
+        else:
+            quotes[restaurant["_id"]] = quote
+
+    if pending:
+        loads = await restaurant_loads(db, (restaurant["_id"] for _, restaurant, _ in pending))
+        for key, restaurant, distance in pending:
+            quote = compute_quote(restaurant, distance, loads[restaurant["_id"]], now)
+            delivery_quotes_cache.set(key, quote)
+            quotes[restaurant["_id"]] = quote
+    return quotes
+
@@ -0,0 +1,99 @@
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from typing import List, Optional, Tuple
+import math
+from services.pagination import encode_cursor, decode_cursor
+from config import PAGE_SIZE_MAX, DEFAULT_DELIVERY_RADIUS_KM, MAX_DELIVERY_RADIUS_KM
+
+# Decimal places kept from client coordinates (~100 m); makes near-me pages cacheable
+COORDINATE_PRECISION = 3
+
+EARTH_RADIUS_KM = 6371.0
+
+def geo_point(lat: float, lng: float) -> dict:
+    """GeoJSON point; note GeoJSON orders coordinates longitude first"""
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+def restaurant_location(address: Optional[dict]) -> Optional[dict]:
+    """The 2dsphere-indexed `location` derived from a restaurant's address coordinates"""
+    coordinates = (address or {}).get("coordinates")
+    if not coordinates:
+        return None
+    return geo_point(coordinates["lat"], coordinates["lng"])
+
+def distance_km(location: dict, lat: float, lng: float) -> float:
+    """Great-circle distance from a GeoJSON point to (lat, lng), as $geoNear measures it"""
+    lng1, lat1 = map(math.radians, location["coordinates"])
+    lat2, lng2 = math.radians(lat), math.radians(lng)
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+def round_coordinates(lat: float, lng: float) -> Tuple[float, float]:
+    return round(lat, COORDINATE_PRECISION), round(lng, COORDINATE_PRECISION)
+
+async def near_restaurants(
+    db: AsyncIOMotorDatabase,
+    lat: float,
+    lng: float,
+    query: dict,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Return one page of restaurants that deliver to (lat, lng), nearest first.
+
+    $geoNear walks the `location` 2dsphere index outward up to
+    MAX_DELIVERY_RADIUS_KM and already yields restaurants nearest first; each
+    is then kept only within its own deliveryRadiusKm. Nothing sorts the
+    stream, so a page stops the walk after limit + 1 results. A cursor holds
+    the last distance and the ids returned at exactly that distance: the next
+    page resumes the walk there via minDistance and skips those ids, because
+    $geoNear orders equidistant restaurants arbitrarily.
+    """
+    limit = min(limit, PAGE_SIZE_MAX)
+    geo_near = {
+        "near": geo_point(lat, lng),
+        "key": "location",
+        "distanceField": "distance",
+        "spherical": True,
+        "maxDistance": MAX_DELIVERY_RADIUS_KM * 1000,
+        "query": query,
+    }
+    resume_distance, skipped_ids = None, []
+    if cursor:
+        resume_distance, skipped_ids = decode_cursor(cursor, 2)
+        if (
+            not isinstance(resume_distance, (int, float))
+            or not isinstance(skipped_ids, list)
+            or not all(isinstance(skipped_id, ObjectId) for skipped_id in skipped_ids)
+        ):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        geo_near["minDistance"] = resume_distance
+        skip = {"_id": {"$nin": skipped_ids}}
+        geo_near["query"] = {"$and": [query, skip]} if query else skip
+    
+    pipeline = [
+        {"$geoNear": geo_near},
+        {"$match": {"$expr": {"$lte": [
+            "$distance",
+            {"$multiply": [{"$ifNull": ["$deliveryRadiusKm", DEFAULT_DELIVERY_RADIUS_KM]}, 1000]},
+        ]}}},
+        {"$limit": limit + 1},
+        {"$project": {**(projection or {}), "distance": 1, "distanceKm": {"$round": [{"$divide": ["$distance", 1000]}, 2]}}},
+    ]
+    documents = await db.restaurants.aggregate(pipeline).to_list(limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last_distance = documents[-1]["distance"]
+        seen_ids = [document["_id"] for document in documents if document["distance"] == last_distance]
+        if last_distance == resume_distance:
+            # The whole page sat at the previous page's distance: keep skipping those too
+            seen_ids += skipped_ids
+        next_cursor = encode_cursor([last_distance, seen_ids])
+    for document in documents:
+        del document["distance"]
+    return documents, next_cursor
@@ -0,0 +1,137 @@
+"""
+Open/closed state from restaurant `hours`, precomputed as minute-of-week intervals.
+
+Each restaurant stores `openIntervals`: half-open [{s, e}] ranges of minutes
+since Monday 00:00 UTC, already shifted from the restaurant's timezone and
+split where they wrap past the end of the week. "Open now" is then a single
+indexed $elemMatch on the current UTC minute. UTC offsets move with daylight
+saving, so a background task recomputes the intervals on a schedule.
+"""
+from fastapi import Request
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from functools import lru_cache
+import asyncio
+import logging
+from services.cache import restaurants_cache
+from services.conditional import bump_collection_version
+from config import DEFAULT_TIMEZONE, OPEN_HOURS_REFRESH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+TRUE_VALUES = {"1", "true", "yes", "on"}
+
+def parse_time(value: str) -> int:
+    """'HH:MM' to minutes after midnight; '24:00' is the end of the day"""
+    hours, _, minutes = value.strip().partition(":")
+    total = int(hours) * 60 + int(minutes or 0)
+    if not 0 <= total <= MINUTES_PER_DAY:
+        raise ValueError(f"Invalid time {value!r}")
+    return total
+
+def minute_of_week(moment: datetime) -> int:
+    """Minutes since Monday 00:00 UTC for an aware or naive-UTC datetime"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+def _merge(intervals: List[List[int]]) -> List[List[int]]:
+    merged: List[List[int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+@lru_cache(maxsize=64)
+def restaurant_zone(name: Optional[str]) -> ZoneInfo:
+    """A restaurant's `hours.timezone`, DEFAULT_TIMEZONE when unset or unknown"""
+    if name:
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.warning(f"Unknown timezone {name!r}, using {DEFAULT_TIMEZONE}")
+    return ZoneInfo(DEFAULT_TIMEZONE)
+
+def open_intervals(hours: Optional[dict], now: Optional[datetime] = None) -> List[dict]:
+    """
+    UTC minute-of-week intervals during which a restaurant with `hours` is open.
+
+    Closing at or before the opening time means the restaurant closes after
+    midnight; equal times mean open around the clock. The UTC offset is taken
+    for the current local week, which is why the result is refreshed.
+    """
+    if not hours:
+        return []
+    try:
+        opens = parse_time(hours["open"])
+        closes = parse_time(hours["close"])
+        zone = ZoneInfo(hours.get("timezone") or DEFAULT_TIMEZONE)
+    except (KeyError, ValueError) as e:
+        logger.warning(f"Ignoring unparseable hours {hours!r}: {e}")
+        return []
+
+    length = (closes - opens) % MINUTES_PER_DAY or MINUTES_PER_DAY
+    local_now = (now or datetime.now(timezone.utc)).astimezone(zone)
+    monday = datetime.combine(local_now.date() - timedelta(days=local_now.weekday()), datetime.min.time(), zone)
+
+    intervals = []
+    for day in range(7):
+        start = minute_of_week(monday + timedelta(days=day, minutes=opens))
+        end = start + length
+        if end > MINUTES_PER_WEEK:
+            intervals.append([start, MINUTES_PER_WEEK])
+            intervals.append([0, end - MINUTES_PER_WEEK])
+        else:
+            intervals.append([start, end])
+    return [{"s": start, "e": end} for start, end in _merge(intervals)]
+
+def open_now_filter(now: Optional[datetime] = None) -> dict:
+    minute = minute_of_week(now or datetime.now(timezone.utc))
+    return {
+        "isOpen": True,
+        "openIntervals": {"$elemMatch": {"s": {"$lte": minute}, "e": {"$gt": minute}}},
+    }
+
+def open_now_variant(request: Request) -> Optional[datetime]:
+    """
+    conditional_get variant for listings filtered with `open=true`.
+
+    Their result changes with the clock, not only with writes, so validators
+    and cache keys also vary per minute.
+    """
+    if request.query_params.get("open", "").lower() not in TRUE_VALUES:
+        return None
+    return datetime.utcnow().replace(second=0, microsecond=0)
+
+async def refresh_open_intervals(db: AsyncIOMotorDatabase) -> int:
+    """Recompute `openIntervals` for every restaurant; returns how many changed"""
+    now = datetime.now(timezone.utc)
+    operations = []
+    async for restaurant in db.restaurants.find({}, {"hours": 1, "openIntervals": 1}):
+        intervals = open_intervals(restaurant.get("hours"), now)
+        if intervals != restaurant.get("openIntervals"):
+            operations.append(UpdateOne({"_id": restaurant["_id"]}, {"$set": {"openIntervals": intervals}}))
+    if operations:
+        await db.restaurants.bulk_write(operations, ordered=False)
+        await bump_collection_version(db, "restaurants")
+        restaurants_cache.invalidate()
+    return len(operations)
+
+async def refresh_open_intervals_periodically(db: AsyncIOMotorDatabase, interval: float = OPEN_HOURS_REFRESH_SECONDS):
+    """Background task keeping intervals in step with UTC offset changes"""
+    while True:
+        try:
+            changed = await refresh_open_intervals(db)
+            if changed:
+                logger.info(f"Recomputed opening hours for {changed} restaurants")
+        except Exception as e:
+            logger.error(f"Opening hours refresh failed: {e}")
+        await asyncio.sleep(interval)
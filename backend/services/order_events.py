@@ -0,0 +1,129 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+from bson import ObjectId
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+import asyncio
+import logging
+from config import ORDER_EVENTS_SOURCE, ORDER_EVENTS_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Only updates that touch the status are of interest to subscribers
+STATUS_CHANGES = [
+    {"$match": {
+        "operationType": "update",
+        "updateDescription.updatedFields.status": {"$exists": True},
+    }},
+]
+
+CHANGE_STREAM_RETRY_SECONDS = 1.0
+
+def status_event(order: dict) -> dict:
+    """The payload pushed to clients for an order status change"""
+    return {
+        "orderId": str(order["_id"]),
+        "status": order["status"],
+        "updatedAt": order["updatedAt"],
+    }
+
+class OrderEventHub:
+    """
+    In-process pub/sub of order status changes, fanned out per user.
+
+    With a replica set, a change stream on `orders` feeds the hub, so every
+    worker sees transitions made by any worker. Otherwise the hub runs in
+    local mode and only the handlers of this process publish to it.
+    """
+
+    def __init__(self, queue_size: int = ORDER_EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.mode = "stopped"
+        self.published = 0
+        self.dropped = 0
+        self._subscribers: Dict[ObjectId, Set[asyncio.Queue]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, db: AsyncIOMotorDatabase, source: str = ORDER_EVENTS_SOURCE):
+        if source != "local":
+            try:
+                stream = db.orders.watch(STATUS_CHANGES, full_document="updateLookup")
+                # Opens the cursor, so an unsupported deployment fails here
+                change = await stream.try_next()
+            except (OperationFailure, NotImplementedError) as e:
+                if source == "change_stream":
+                    raise
+                logger.info(f"Order change stream unavailable, publishing locally: {e}")
+            else:
+                self.mode = "change_stream"
+                if change is not None:
+                    self._publish_change(change)
+                self._task = asyncio.create_task(self._consume(db, stream))
+                return
+        self.mode = "local"
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.mode = "stopped"
+
+    async def _consume(self, db: AsyncIOMotorDatabase, stream):
+        while True:
+            try:
+                async with stream:
+                    async for change in stream:
+                        self._publish_change(change)
+            except PyMongoError as e:
+                logger.warning(f"Order change stream interrupted, resuming: {e}")
+                await asyncio.sleep(CHANGE_STREAM_RETRY_SECONDS)
+                stream = db.orders.watch(
+                    STATUS_CHANGES, full_document="updateLookup", resume_after=stream.resume_token
+                )
+
+    def _publish_change(self, change: dict):
+        order = change.get("fullDocument")
+        if order is not None:
+            self.publish(order["userId"], status_event(order))
+
+    def publish(self, user_id: ObjectId, event: dict):
+        self.published += 1
+        for queue in self._subscribers.get(user_id, ()):
+            if queue.full():
+                # A client that stopped reading loses its oldest events, never blocks others
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+
+    def publish_local(self, order: dict):
+        """Publish from a handler; a no-op when the change stream delivers the event"""
+        if self.mode == "local":
+            self.publish(order["userId"], status_event(order))
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: ObjectId) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "users": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+order_events = OrderEventHub()
@@ -0,0 +1,198 @@
+from fastapi import HTTPException
+from typing import Iterable, List, Optional, Sequence
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from bson import ObjectId
+from datetime import datetime, timezone
+import asyncio
+from models.order import OrderItemCreate, OrderResponse
+from services.delivery import quote_restaurants
+from services.geo import distance_km
+from config import SERVICE_FEE, MAX_ORDER_LINES
+
+UNKNOWN_RESTAURANT = "Unknown Restaurant"
+
+# Allowed status changes; delivered and cancelled are final
+ORDER_TRANSITIONS = {
+    "pending": {"confirmed", "cancelled"},
+    "confirmed": {"preparing", "cancelled"},
+    "preparing": {"out_for_delivery", "cancelled"},
+    "out_for_delivery": {"delivered"},
+    "delivered": set(),
+    "cancelled": set(),
+}
+
+ORDER_STATUSES = set(ORDER_TRANSITIONS)
+
+# Orders still in a restaurant's queue
+ACTIVE_ORDER_STATUSES = sorted(status for status, targets in ORDER_TRANSITIONS.items() if targets)
+
+# The statuses each status can be reached from
+_TRANSITION_SOURCES = {
+    status: sorted(source for source, targets in ORDER_TRANSITIONS.items() if status in targets)
+    for status in ORDER_STATUSES
+}
+
+def utcnow() -> datetime:
+    """Current time at the millisecond precision Mongo stores, so it compares equal after a round-trip"""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+async def get_restaurant_names(db: AsyncIOMotorDatabase, restaurant_ids: Iterable) -> dict:
+    """Resolve restaurant names for a set of ids in a single round-trip"""
+    ids = list(set(restaurant_ids))
+    if not ids:
+        return {}
+    
+    restaurants = await db.restaurants.find(
+        {"_id": {"$in": ids}}, {"name": 1}
+    ).to_list(len(ids))
+    return {restaurant["_id"]: restaurant["name"] for restaurant in restaurants}
+
+def to_order_response(order: dict, restaurant_name: str) -> OrderResponse:
+    return OrderResponse(
+        id=str(order["_id"]),
+        userId=str(order["userId"]),
+        restaurantId=str(order["restaurantId"]),
+        restaurantName=restaurant_name,
+        items=order["items"],
+        deliveryAddress=order["deliveryAddress"],
+        paymentMethod=order["paymentMethod"],
+        subtotal=order["subtotal"],
+        deliveryFee=order["deliveryFee"],
+        serviceFee=order["serviceFee"],
+        total=order["total"],
+        status=order["status"],
+        statusHistory=order.get("statusHistory", []),
+        createdAt=order["createdAt"],
+        updatedAt=order["updatedAt"]
+    )
+
+async def build_order_responses(db: AsyncIOMotorDatabase, orders: List[dict]) -> List[OrderResponse]:
+    """Attach restaurant names to raw order documents with one batched lookup"""
+    names = await get_restaurant_names(db, (order["restaurantId"] for order in orders))
+    return [
+        to_order_response(order, names.get(order["restaurantId"], UNKNOWN_RESTAURANT))
+        for order in orders
+    ]
+
+def _object_id(value: str, name: str) -> ObjectId:
+    if not ObjectId.is_valid(value):
+        raise HTTPException(status_code=400, detail=f"Invalid {name}")
+    return ObjectId(value)
+
+async def price_order(
+    db: AsyncIOMotorDatabase,
+    restaurant_id: str,
+    items: Sequence[OrderItemCreate],
+    delivery_address: Optional[dict] = None,
+) -> dict:
+    """
+    Resolve order lines against menu_items and compute the totals server-side.
+
+    All menu items are fetched with one $in query scoped to the restaurant,
+    concurrently with the restaurant lookup. Items that don't exist, belong to
+    another restaurant or are unavailable reject the whole order. Returns the
+    order fields (restaurantId, items, subtotal, fees, total) plus the
+    restaurant name for the response under "restaurantName".
+    The delivery fee is the restaurant's current delivery quote, using the
+    distance to `delivery_address` when both sides have coordinates.
+    """
+    if len(items) > MAX_ORDER_LINES:
+        raise HTTPException(status_code=400, detail=f"An order can have at most {MAX_ORDER_LINES} items")
+    
+    restaurant_oid = _object_id(restaurant_id, "restaurant ID")
+    item_ids = [_object_id(item.menuItemId, "menu item ID") for item in items]
+    
+    restaurant, menu_items = await asyncio.gather(
+        db.restaurants.find_one({"_id": restaurant_oid}, {"name": 1, "deliveryFee": 1, "hours": 1, "location": 1}),
+        db.menu_items.find(
+            {"_id": {"$in": list(set(item_ids))}, "restaurantId": restaurant_oid},
+            {"name": 1, "price": 1, "isAvailable": 1}
+        ).to_list(None),
+    )
+    if not restaurant:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    
+    menu = {menu_item["_id"]: menu_item for menu_item in menu_items}
+    missing = sorted({str(item_id) for item_id in item_ids if item_id not in menu})
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Menu items not found for this restaurant: {', '.join(missing)}")
+    unavailable = sorted({menu[item_id]["name"] for item_id in item_ids if not menu[item_id].get("isAvailable", True)})
+    if unavailable:
+        raise HTTPException(status_code=409, detail=f"Menu items currently unavailable: {', '.join(unavailable)}")
+    
+    lines = [
+        {
+            "menuItemId": item_id,
+            "name": menu[item_id]["name"],
+            "price": menu[item_id]["price"],
+            "quantity": item.quantity,
+        }
+        for item_id, item in zip(item_ids, items)
+    ]
+    subtotal = round(sum(line["price"] * line["quantity"] for line in lines), 2)
+    
+    coordinates = (delivery_address or {}).get("coordinates")
+    distances = {}
+    if coordinates and restaurant.get("location"):
+        distances[restaurant_oid] = distance_km(restaurant["location"], coordinates["lat"], coordinates["lng"])
+    quotes = await quote_restaurants(db, [restaurant], distances)
+    delivery_fee = quotes[restaurant_oid]["fee"]
+    return {
+        "restaurantId": restaurant_oid,
+        "restaurantName": restaurant["name"],
+        "items": lines,
+        "subtotal": subtotal,
+        "deliveryFee": delivery_fee,
+        "serviceFee": SERVICE_FEE,
+        "total": round(subtotal + delivery_fee + SERVICE_FEE, 2),
+    }
+
+async def transition_order(
+    db: AsyncIOMotorDatabase,
+    order_id: ObjectId,
+    status: str,
+    expected_updated_at: Optional[datetime] = None,
+) -> dict:
+    """
+    Move an order to `status` if ORDER_TRANSITIONS allows it from its current status.
+
+    The check and the write are one conditional find_one_and_update, so of
+    several concurrent transitions only those valid against the stored status
+    succeed. With `expected_updated_at` the change also fails if anything
+    modified the order since the caller read it. Returns the order's userId,
+    status, statusHistory and updatedAt after the change.
+    """
+    if status not in ORDER_STATUSES:
+        raise HTTPException(status_code=400, detail="Invalid status")
+    
+    query = {"_id": order_id, "status": {"$in": _TRANSITION_SOURCES[status]}}
+    if expected_updated_at is not None:
+        if expected_updated_at.tzinfo is not None:
+            expected_updated_at = expected_updated_at.astimezone(timezone.utc).replace(tzinfo=None)
+        query["updatedAt"] = expected_updated_at
+    
+    now = utcnow()
+    order = await db.orders.find_one_and_update(
+        query,
+        {
+            "$set": {"status": status, "updatedAt": now},
+            "$push": {"statusHistory": {"status": status, "at": now}},
+        },
+        projection={"userId": 1, "status": 1, "statusHistory": 1, "updatedAt": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if order is not None:
+        return order
+    
+    # Nothing matched: work out why for the error response
+    current = await db.orders.find_one({"_id": order_id}, {"status": 1, "updatedAt": 1})
+    if current is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    if status in ORDER_TRANSITIONS.get(current["status"], ()):
+        raise HTTPException(status_code=409, detail="Order was modified by another request")
+    raise HTTPException(
+        status_code=409,
+        detail=f"Cannot change order status from {current['status']} to {status}"
+    )
@@ -0,0 +1,61 @@
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorCollection
+from bson import json_util
+from bson.errors import BSONError
+from typing import List, Optional, Tuple
+import base64
+from config import PAGE_SIZE_MAX
+
+def encode_cursor(values: list) -> str:
+    """Encode the sort-key values of the last returned document as an opaque token"""
+    raw = json_util.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json_util.loads(raw)
+    # Malformed Extended JSON ({"$oid": "zz"}, {"$date": "xx"}, ...) fails in
+    # the matching bson constructor, so cover the errors those raise
+    except (ValueError, TypeError, LookupError, ArithmeticError, BSONError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def keyset_filter(sort: List[Tuple[str, int]], values: list) -> dict:
+    """Build the filter selecting documents strictly after `values` in `sort` order"""
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        branch = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        branch[field] = {"$gt" if direction > 0 else "$lt": values[i]}
+        branches.append(branch)
+    return branches[0] if len(branches) == 1 else {"$or": branches}
+
+async def paginate(
+    collection: AsyncIOMotorCollection,
+    query: dict,
+    sort: List[Tuple[str, int]],
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Fetch one page of `collection` using keyset pagination.
+
+    `sort` must end with `_id` so the order is total. Returns the page documents
+    and the cursor for the next page, or None when this is the last page.
+    """
+    limit = min(limit, PAGE_SIZE_MAX)
+    if cursor:
+        after = keyset_filter(sort, decode_cursor(cursor, len(sort)))
+        query = {"$and": [query, after]} if query else after
+    
+    documents = await collection.find(query, projection).sort(sort).limit(limit + 1).to_list(limit + 1)
+    
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor([last[field] for field, _ in sort])
+    return documents, next_cursor
@@ -0,0 +1,66 @@
+"""
+Restaurant detail pages: the restaurant and its whole menu in one payload.
+
+Payloads are encoded (and compressed, per encoding asked for) once and kept
+in restaurant_details_cache per restaurant and `restaurants`/`menu_items`
+collection versions, together with validators derived from the bytes. A
+write bumps a version, so a payload built from data read before the write
+is stored under a key no later request asks for; other workers pick up the
+new version within COLLECTION_VERSION_TTL_SECONDS. Writes also drop the
+restaurant's entries so they do not wait for the TTL to free memory.
+"""
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+import asyncio
+from models.restaurant import Restaurant
+from models.menu_item import MenuItem
+from models.restaurant_detail import RestaurantDetail
+from services.cache import restaurant_details_cache, MISSING
+from services.conditional import CollectionVersion, get_collection_version, payload_version
+from services.serialization import model_projection, serialize_document
+from services.compression import CompressedBody
+
+RESTAURANT_PROJECTION = model_projection(Restaurant)
+MENU_ITEM_PROJECTION = model_projection(MenuItem)
+
+class DetailPayload(NamedTuple):
+    body: CompressedBody
+    version: CollectionVersion
+
+def group_menu(menu_items: List[dict]) -> List[dict]:
+    """Menu sections in order of each category's first item, items in _id order"""
+    sections: Dict[str, List[dict]] = {}
+    for menu_item in menu_items:
+        sections.setdefault(menu_item["category"], []).append(menu_item)
+    return [{"category": category, "items": items} for category, items in sections.items()]
+
+async def build_restaurant_detail(db: AsyncIOMotorDatabase, restaurant_id: ObjectId) -> Optional[DetailPayload]:
+    restaurant, menu_items = await asyncio.gather(
+        db.restaurants.find_one({"_id": restaurant_id}, RESTAURANT_PROJECTION),
+        db.menu_items.find({"restaurantId": restaurant_id}, MENU_ITEM_PROJECTION).sort("_id", 1).to_list(None),
+    )
+    if restaurant is None:
+        return None
+    body = serialize_document({"restaurant": restaurant, "menu": group_menu(menu_items)}, RestaurantDetail)
+    return DetailPayload(CompressedBody(body), payload_version(body, datetime.utcnow()))
+
+async def get_restaurant_detail(db: AsyncIOMotorDatabase, restaurant_id: ObjectId) -> Optional[DetailPayload]:
+    """The cached payload for `restaurant_id`, built on a miss; None if it doesn't exist"""
+    # Versions are read before the data, so a racing write leaves this key behind
+    restaurants_version, menu_items_version = await asyncio.gather(
+        get_collection_version(db, "restaurants"),
+        get_collection_version(db, "menu_items"),
+    )
+    key = (restaurant_id, restaurants_version.version, menu_items_version.version)
+    payload = restaurant_details_cache.get(key)
+    if payload is MISSING:
+        payload = await build_restaurant_detail(db, restaurant_id)
+        if payload is not None:
+            restaurant_details_cache.set(key, payload)
+    return payload
+
+def invalidate_restaurant_detail(restaurant_id: ObjectId):
+    """Drop the payloads after a write to the restaurant or one of its menu items"""
+    restaurant_details_cache.invalidate_where(lambda key: key[0] == restaurant_id)
@@ -0,0 +1,67 @@
+from fastapi import HTTPException
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+from services.search import category_term, normalize, query_tokens, build_search_filter
+
+MAX_CATEGORY_LENGTH = 50
+MAX_SEARCH_LENGTH = 100
+
+# Distinct (category, search tokens) shapes kept compiled
+QUERY_CACHE_SIZE = 256
+
+# Slider entries with a dedicated filter instead of a cuisine/category match
+PROMO_CATEGORY = "promocoes"
+ALL_CATEGORY = "all"
+
+class RestaurantQuery(NamedTuple):
+    # Shared between requests through the cache: treat as read-only
+    filter: dict
+    search_tokens: Tuple[str, ...]
+    # A search with no word characters at all ("?!"): no restaurant matches
+    matches_nothing: bool = False
+
+def _clean(value: Optional[str], max_length: int, name: str) -> Optional[str]:
+    if value is None:
+        return None
+    value = " ".join(value.split())
+    if len(value) > max_length:
+        raise HTTPException(status_code=400, detail=f"{name} is too long")
+    return value or None
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _compile(category: Optional[str], search_tokens: Tuple[str, ...]) -> dict:
+    clauses = []
+
+    if category is not None:
+        if normalize(category) == PROMO_CATEGORY:
+            clauses.append({"promo": {"$ne": None}})
+        else:
+            # Exact match on one indexed field: a point lookup for every slider value
+            clauses.append({"categoryTerms": category_term(category)})
+
+    if search_tokens:
+        clauses.append(build_search_filter(search_tokens))
+
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def build_restaurant_query(category: Optional[str] = None, search: Optional[str] = None) -> RestaurantQuery:
+    """
+    Compose the restaurant listing filter from the category slider and search box.
+
+    Inputs are whitespace-normalized and length-checked; filters are combined
+    with $and so neither overwrites the other. Compiled filters are cached per
+    (category, search tokens), so the handful of slider values are built once
+    and always produce the same query shape for the planner.
+    """
+    category = _clean(category, MAX_CATEGORY_LENGTH, "Category")
+    if category is not None and category.lower() == ALL_CATEGORY:
+        category = None
+    search = _clean(search, MAX_SEARCH_LENGTH, "Search")
+    search_tokens = tuple(query_tokens(search)) if search else ()
+    return RestaurantQuery(_compile(category, search_tokens), search_tokens, bool(search) and not search_tokens)
+
+def query_cache_info() -> dict:
+    info = _compile.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxSize": info.maxsize}
@@ -0,0 +1,182 @@
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from pymongo import UpdateOne
+from typing import List, Optional, Sequence, Tuple
+import re
+import unicodedata
+from services.pagination import encode_cursor, decode_cursor
+from config import PAGE_SIZE_MAX
+
+# Restaurant fields indexed for search and their ranking weight
+SEARCH_FIELDS = {"name": 3.0, "cuisine": 2.0, "categories": 2.0, "description": 1.0}
+
+# Upper bound on documents ranked per search; keeps one-letter prefix queries cheap.
+# Broader queries rank only the best-rated matches and report the page as truncated.
+SEARCH_MAX_CANDIDATES = 1000
+
+# Shortest word stored in `searchTerms`; shorter query words still prefix-match
+MIN_TOKEN_LENGTH = 2
+
+STOPWORDS = {
+    "a", "o", "as", "os", "de", "da", "do", "das", "dos", "e", "em", "na", "no",
+    "nas", "nos", "com", "por", "para", "um", "uma", "ao", "aos",
+}
+
+TOKEN_RE = re.compile(r"\w+")
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents: 'Hambúrgueres' -> 'hamburgueres'"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+def tokenize(text: str) -> List[str]:
+    return [
+        token for token in TOKEN_RE.findall(normalize(text))
+        if len(token) >= MIN_TOKEN_LENGTH and token not in STOPWORDS
+    ]
+
+def query_tokens(text: str) -> List[str]:
+    """
+    Search box words to prefix-match, stopwords dropped.
+
+    One-letter words are kept (the first keystroke of search-as-you-type), and
+    a query made only of stopwords keeps them, so "do" still finds "doces".
+    """
+    words = list(dict.fromkeys(TOKEN_RE.findall(normalize(text))))
+    return [word for word in words if word not in STOPWORDS] or words
+
+def _field_tokens(restaurant: dict, field: str) -> List[str]:
+    value = restaurant.get(field) or ""
+    if isinstance(value, list):
+        value = " ".join(value)
+    return tokenize(value)
+
+def search_terms(restaurant: dict) -> List[str]:
+    """The deduplicated token list stored on a restaurant as `searchTerms`"""
+    terms = set()
+    for field in SEARCH_FIELDS:
+        terms.update(_field_tokens(restaurant, field))
+    return sorted(terms)
+
+def category_term(value: str) -> str:
+    """A cuisine, category or slider value as stored in `categoryTerms`: 'Hambúrgueres' -> 'hamburgueres'"""
+    return normalize(" ".join(value.split()))
+
+def category_terms(restaurant: dict) -> List[str]:
+    """The normalized cuisine and categories, matched exactly by the category slider"""
+    values = [restaurant.get("cuisine") or "", *(restaurant.get("categories") or [])]
+    return sorted({category_term(value) for value in values if value.strip()})
+
+def derived_terms(restaurant: dict) -> dict:
+    """The `searchTerms` and `categoryTerms` stored with a restaurant"""
+    return {"searchTerms": search_terms(restaurant), "categoryTerms": category_terms(restaurant)}
+
+def touches_search_fields(update: dict) -> bool:
+    return any(field in update for field in SEARCH_FIELDS)
+
+def build_search_filter(tokens: Sequence[str]) -> dict:
+    """
+    Every query token must prefix-match one of the stored terms.
+
+    The patterns are escaped and anchored, so they are range scans on the
+    `searchTerms` index and cannot be used to inject arbitrary expressions.
+    """
+    clauses = [{"searchTerms": {"$regex": f"^{re.escape(token)}"}} for token in tokens]
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def score(restaurant: dict, tokens: Sequence[str]) -> float:
+    """Weighted relevance: exact term matches count double a prefix match"""
+    total = 0.0
+    for field, weight in SEARCH_FIELDS.items():
+        field_tokens = _field_tokens(restaurant, field)
+        for token in tokens:
+            if token in field_tokens:
+                total += 2 * weight
+            elif any(t.startswith(token) for t in field_tokens):
+                total += weight
+    return total
+
+async def search_restaurants(
+    db: AsyncIOMotorDatabase,
+    query: dict,
+    tokens: Sequence[str],
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = None,
+) -> Tuple[List[dict], Optional[str], bool]:
+    """
+    Return one page of restaurants matching `query`, best match for `tokens` first,
+    plus whether more than SEARCH_MAX_CANDIDATES matched.
+
+    `query` must include the search filter (see services.restaurant_query).
+    Candidates are fetched through the `searchTerms` index, ranked in process
+    and paged by (score, _id) so the cursor stays stable across requests.
+    When the query matches too many restaurants, the best-rated
+    SEARCH_MAX_CANDIDATES are ranked, so every page sees the same set.
+    """
+    limit = min(limit, PAGE_SIZE_MAX)
+    candidates = await (
+        db.restaurants.find(query, projection)
+        .sort([("rating", -1), ("_id", 1)])
+        .limit(SEARCH_MAX_CANDIDATES + 1)
+        .to_list(SEARCH_MAX_CANDIDATES + 1)
+    )
+    truncated = len(candidates) > SEARCH_MAX_CANDIDATES
+    candidates = candidates[:SEARCH_MAX_CANDIDATES]
+    ranked = sorted(
+        ((score(restaurant, tokens), restaurant) for restaurant in candidates),
+        key=lambda pair: (-pair[0], pair[1]["_id"]),
+    )
+
+    if cursor:
+        last_score, last_id = decode_cursor(cursor, 2)
+        if not isinstance(last_score, (int, float)) or not isinstance(last_id, ObjectId):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        ranked = [
+            (s, restaurant) for s, restaurant in ranked
+            if (-s, restaurant["_id"]) > (-last_score, last_id)
+        ]
+
+    page = ranked[:limit]
+    next_cursor = None
+    if len(ranked) > limit:
+        last_score, last = page[-1]
+        next_cursor = encode_cursor([last_score, last["_id"]])
+    return [restaurant for _, restaurant in page], next_cursor, truncated
+
+async def sync_search_terms(db: AsyncIOMotorDatabase, restaurant: dict) -> dict:
+    """
+    Store the `derived_terms` of `restaurant`, a just-updated document.
+
+    The write only applies while the search fields still hold the values the
+    terms were built from; when a concurrent update changed them, the current
+    fields are read back and the terms rebuilt, so the last writer's terms win.
+    """
+    projection = {field: 1 for field in SEARCH_FIELDS}
+    while True:
+        terms = derived_terms(restaurant)
+        source = {field: restaurant.get(field) for field in SEARCH_FIELDS}
+        result = await db.restaurants.update_one(
+            {"_id": restaurant["_id"], **source},
+            {"$set": terms}
+        )
+        if result.matched_count:
+            return terms
+        restaurant = await db.restaurants.find_one({"_id": restaurant["_id"]}, projection)
+        if restaurant is None:
+            return terms
+
+async def backfill_search_terms(db: AsyncIOMotorDatabase) -> int:
+    """Populate `searchTerms` and `categoryTerms` on restaurants created before they existed"""
+    projection = {field: 1 for field in SEARCH_FIELDS}
+    query = {"$or": [{"searchTerms": {"$exists": False}}, {"categoryTerms": {"$exists": False}}]}
+    operations = []
+    async for restaurant in db.restaurants.find(query, projection):
+        operations.append(UpdateOne(
+            {"_id": restaurant["_id"]},
+            {"$set": derived_terms(restaurant)}
+        ))
+    if operations:
+        await db.restaurants.bulk_write(operations, ordered=False)
+    return len(operations)
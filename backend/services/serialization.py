@@ -0,0 +1,101 @@
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+from decimal import Decimal
+from typing import Any, FrozenSet, Iterable, List, Optional, Type
+import orjson
+from config import VALIDATE_RESPONSES
+
+class JSONBytesResponse(Response):
+    """Response whose body is already-encoded JSON"""
+    media_type = "application/json"
+
+class ORJSONResponse(JSONResponse):
+    """App-wide default response class, encoding with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def model_projection(model: Type[BaseModel]) -> dict:
+    """Mongo projection returning exactly the fields `model` exposes"""
+    return {field.alias or name: 1 for name, field in model.model_fields.items()}
+
+def stored_defaults(model: Type[BaseModel]) -> dict:
+    """Fields a create `model` fills in when the client leaves them out, with their defaults"""
+    return {
+        field.alias or name: field.default
+        for name, field in model.model_fields.items()
+        if not field.is_required() and field.default_factory is None
+    }
+
+async def backfill_defaults(collection: AsyncIOMotorCollection, model: Type[BaseModel]) -> int:
+    """
+    Store the `stored_defaults(model)` missing from documents written before those fields existed.
+
+    Raw documents are encoded as stored, so a field the model defaults would
+    otherwise be left out of responses instead of taking its default.
+    """
+    defaults = stored_defaults(model)
+    if not defaults:
+        return 0
+    query = {"$or": [{field: {"$exists": False}} for field in defaults]}
+    operations = []
+    async for document in collection.find(query, {field: 1 for field in defaults}):
+        missing = {field: value for field, value in defaults.items() if field not in document}
+        operations.append(UpdateOne({"_id": document["_id"]}, {"$set": missing}))
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+    return len(operations)
+
+def sparse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    """
+    Parse a `fields=name,rating` sparse fieldset against the fields `model` exposes.
+
+    Returns None when no fieldset was given. `_id` (also accepted as `id`)
+    is always included, so clients can still key and page the results.
+    """
+    if fields is None:
+        return None
+    allowed = set(model_projection(model))
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    requested = {"_id" if field == "id" else field for field in requested}
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return frozenset(requested | {"_id"})
+
+def _default(value):
+    # orjson encodes datetime natively; naive values keep the isoformat() shape
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal):
+        # Same as Pydantic's JSON mode: keep the exact digits
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+def check_documents(documents: Iterable[dict], model: Optional[Type[BaseModel]]):
+    """Schema check for raw documents, enabled with VALIDATE_RESPONSES; sparse fieldsets pass None"""
+    if VALIDATE_RESPONSES and model is not None:
+        for document in documents:
+            model.model_validate(document)
+
+def serialize_document(document: dict, model: Type[BaseModel]) -> bytes:
+    """Encode a raw Mongo document projected with `model_projection(model)`"""
+    check_documents([document], model)
+    return dumps(document)
+
+def serialize_page(
+    documents: List[dict],
+    next_cursor: Optional[str],
+    model: Optional[Type[BaseModel]],
+    truncated: bool = False,
+) -> bytes:
+    """Encode a page envelope matching `Page[model]` without building models"""
+    check_documents(documents, model)
+    return dumps({"items": documents, "next_cursor": next_cursor, "truncated": truncated})
@@ -63,7 +63,7 @@ class VizinhandoAPITester:
             response = self.session.get(f"{self.base_url}/restaurants")
             
             if response.status_code == 200:
-                restaurants = response.json()
+                restaurants = response.json()["items"]
                 
                 if isinstance(restaurants, list):
                     if len(restaurants) > 0:
@@ -109,7 +109,7 @@ class VizinhandoAPITester:
             response = self.session.get(f"{self.base_url}/categories")
             
             if response.status_code == 200:
-                categories = response.json()
+                categories = response.json()["items"]
                 
                 if isinstance(categories, list):
                     if len(categories) > 0:
@@ -191,7 +191,7 @@ class VizinhandoAPITester:
             response = self.session.get(f"{self.base_url}/restaurants/{restaurant_id}/menu")
             
             if response.status_code == 200:
-                menu_items = response.json()
+                menu_items = response.json()["items"]
                 
                 if isinstance(menu_items, list):
                     self.log_test("Restaurant Menu", True, 
@@ -215,7 +215,7 @@ class VizinhandoAPITester:
             response = self.session.get(f"{self.base_url}/restaurants?category=Italiana")
             
             if response.status_code == 200:
-                filtered_restaurants = response.json()
+                filtered_restaurants = response.json()["items"]
                 self.log_test("Restaurant Category Filter", True, 
                             f"Category filter returned {len(filtered_restaurants)} restaurants")
             else:
@@ -225,7 +225,7 @@ class VizinhandoAPITester:
             response = self.session.get(f"{self.base_url}/restaurants?search=pizza")
             
             if response.status_code == 200:
-                search_restaurants = response.json()
+                search_restaurants = response.json()["items"]
                 self.log_test("Restaurant Search Filter", True, 
                             f"Search filter returned {len(search_restaurants)} restaurants")
             else:
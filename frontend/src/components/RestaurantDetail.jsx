@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { Button } from './ui/button';
 import { Badge } from './ui/badge';
 import { Card, CardContent } from './ui/card';
@@ -14,10 +14,23 @@ import {
   Info
 } from 'lucide-react';
 import { mockMenuItems } from '../data/mock';
+import { restaurantService } from '../services/api';
 
 const RestaurantDetail = ({ restaurant, onBack, onAddToCart }) => {
   const [cartItems, setCartItems] = useState({});
-  const menuItems = mockMenuItems[restaurant.id] || [];
+  const [menuItems, setMenuItems] = useState(mockMenuItems[restaurant.id] || []);
+
+  useEffect(() => {
+    // Mock restaurants have no _id and keep their mock menu
+    if (!restaurant._id) return;
+    restaurantService.getDetail(restaurant._id)
+      .then((detail) => {
+        setMenuItems(detail.menu.flatMap((section) => (
+          section.items.map((item) => ({ ...item, id: item._id }))
+        )));
+      })
+      .catch((error) => console.error('Error loading menu:', error));
+  }, [restaurant._id]);
 
   const updateCartItem = (itemId, change) => {
     setCartItems(prev => {
@@ -39,14 +52,14 @@ const RestaurantDetail = ({ restaurant, onBack, onAddToCart }) => {
 
   const getTotalPrice = () => {
     return Object.entries(cartItems).reduce((sum, [itemId, qty]) => {
-      const item = menuItems.find(item => item.id === parseInt(itemId));
+      const item = menuItems.find(item => String(item.id) === itemId);
       return sum + (item ? item.price * qty : 0);
     }, 0);
   };
 
   const handleCheckout = () => {
     const orderItems = Object.entries(cartItems).map(([itemId, qty]) => {
-      const item = menuItems.find(item => item.id === parseInt(itemId));
+      const item = menuItems.find(item => String(item.id) === itemId);
       return { ...item, quantity: qty };
     });
     
@@ -6,23 +6,71 @@ const getAuthToken = () => {
   return localStorage.getItem('auth_token');
 };
 
+const storeTokens = (response) => {
+  if (response && response.access_token) {
+    localStorage.setItem('auth_token', response.access_token);
+  }
+  if (response && response.refresh_token) {
+    localStorage.setItem('refresh_token', response.refresh_token);
+  }
+};
+
+const clearTokens = () => {
+  localStorage.removeItem('auth_token');
+  localStorage.removeItem('refresh_token');
+};
+
+// Exchange the refresh token for a new pair; concurrent 401s share one request
+let refreshInFlight = null;
+const refreshTokens = () => {
+  const refreshToken = localStorage.getItem('refresh_token');
+  if (!refreshToken) return Promise.resolve(false);
+
+  if (!refreshInFlight) {
+    refreshInFlight = fetch(`${API_BASE}/users/refresh`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    })
+      .then(async (response) => {
+        if (!response.ok) {
+          clearTokens();
+          return false;
+        }
+        storeTokens(await response.json());
+        return true;
+      })
+      .catch(() => false)
+      .finally(() => {
+        refreshInFlight = null;
+      });
+  }
+  return refreshInFlight;
+};
+
 // Helper function to make API requests
-const apiRequest = async (endpoint, options = {}) => {
+const apiRequest = async (endpoint, options = {}, retried = false) => {
   const url = `${API_BASE}${endpoint}`;
   const token = getAuthToken();
   
+  // Spread options first so per-request headers add to the defaults instead of replacing them
   const config = {
+    ...options,
     headers: {
       'Content-Type': 'application/json',
       ...(token && { Authorization: `Bearer ${token}` }),
       ...options.headers,
     },
-    ...options,
   };
 
   try {
     const response = await fetch(url, config);
     
+    // Access tokens are short-lived: refresh once and replay the request
+    if (response.status === 401 && token && !retried && await refreshTokens()) {
+      return apiRequest(endpoint, options, true);
+    }
+    
     if (!response.ok) {
       const errorData = await response.json().catch(() => ({ message: 'Unknown error' }));
       throw new Error(errorData.message || `HTTP ${response.status}`);
@@ -39,10 +87,35 @@ const apiRequest = async (endpoint, options = {}) => {
   }
 };
 
+// Largest page the API serves (PAGE_SIZE_MAX) and the most rows a list view loads
+const PAGE_SIZE = 100;
+const MAX_LIST_ITEMS = 1000;
+
+// Follow next_cursor until the list is complete, or MAX_LIST_ITEMS are loaded
+const fetchAllPages = async (endpoint, params = new URLSearchParams()) => {
+  const items = [];
+  let cursor = null;
+  let truncated = false;
+  params.set('limit', PAGE_SIZE);
+  
+  do {
+    if (cursor) params.set('cursor', cursor);
+    const page = await apiRequest(`${endpoint}?${params.toString()}`);
+    items.push(...page.items);
+    cursor = page.next_cursor;
+    truncated = truncated || page.truncated;
+  } while (cursor && items.length < MAX_LIST_ITEMS);
+  
+  if (cursor || truncated) {
+    console.warn(`${endpoint}: showing the first ${items.length} results, more are available`);
+  }
+  return items;
+};
+
 // Restaurant services
 export const restaurantService = {
+  // Card fields only; the detail view loads the full restaurant
   getAll: async (category = null, search = null) => {
-    let endpoint = '/restaurants';
     const params = new URLSearchParams();
     
     if (category && category !== 'all') {
@@ -52,19 +125,30 @@ export const restaurantService = {
       params.append('search', search);
     }
     
-    if (params.toString()) {
-      endpoint += `?${params.toString()}`;
-    }
-    
-    return apiRequest(endpoint);
+    const restaurants = await fetchAllPages('/restaurants/summary', params);
+    // Show the live delivery quote in place of the static fee and time
+    return restaurants.map((restaurant) => (
+      restaurant.deliveryQuote
+        ? {
+            ...restaurant,
+            deliveryFee: restaurant.deliveryQuote.fee,
+            deliveryTime: restaurant.deliveryQuote.deliveryTime,
+          }
+        : restaurant
+    ));
   },
 
   getById: async (id) => {
     return apiRequest(`/restaurants/${id}`);
   },
 
+  // Restaurant plus its menu grouped by category, in one request
+  getDetail: async (id) => {
+    return apiRequest(`/restaurants/${id}/detail`);
+  },
+
   getMenu: async (restaurantId) => {
-    return apiRequest(`/restaurants/${restaurantId}/menu`);
+    return fetchAllPages(`/restaurants/${restaurantId}/menu`);
   },
 
   create: async (restaurantData) => {
@@ -91,7 +175,7 @@ export const restaurantService = {
 // Category services
 export const categoryService = {
   getAll: async () => {
-    return apiRequest('/categories');
+    return fetchAllPages('/categories');
   },
 
   create: async (categoryData) => {
@@ -110,10 +194,8 @@ export const userService = {
       body: JSON.stringify(userData),
     });
     
-    // Store token
-    if (response.access_token) {
-      localStorage.setItem('auth_token', response.access_token);
-    }
+    // Store tokens
+    storeTokens(response);
     
     return response;
   },
@@ -124,16 +206,18 @@ export const userService = {
       body: JSON.stringify(credentials),
     });
     
-    // Store token
-    if (response.access_token) {
-      localStorage.setItem('auth_token', response.access_token);
-    }
+    // Store tokens
+    storeTokens(response);
     
     return response;
   },
 
   logout: () => {
-    localStorage.removeItem('auth_token');
+    // Revoke the tokens server-side too; local state is cleared either way
+    if (getAuthToken()) {
+      apiRequest('/users/logout', { method: 'POST' }, true).catch(() => {});
+    }
+    clearTokens();
   },
 
   getProfile: async () => {
@@ -172,19 +256,32 @@ export const orderService = {
   },
 
   getAll: async () => {
-    return apiRequest('/orders');
+    return fetchAllPages('/orders');
   },
 
   getById: async (id) => {
     return apiRequest(`/orders/${id}`);
   },
 
-  updateStatus: async (id, status) => {
+  // Restaurant staff only: the key configured as STAFF_API_KEY on the backend
+  updateStatus: async (id, status, staffKey) => {
     return apiRequest(`/orders/${id}/status`, {
       method: 'PUT',
+      headers: { 'X-Staff-Key': staffKey },
       body: JSON.stringify({ status }),
     });
   },
+
+  // Push status changes instead of polling getById; returns an unsubscribe function
+  subscribeStatus: (onStatus, orderId = null) => {
+    const params = new URLSearchParams({ access_token: getAuthToken() || '' });
+    if (orderId) {
+      params.append('orderId', orderId);
+    }
+    const source = new EventSource(`${API_BASE}/orders/events?${params.toString()}`);
+    source.addEventListener('order_status', (event) => onStatus(JSON.parse(event.data)));
+    return () => source.close();
+  },
 };
 
 // Menu item services
@@ -0,0 +1,126 @@
+"""
+Backend tests run the FastAPI app in process against mongomock-motor.
+
+No MongoDB server is needed. From the repository root:
+
+    pip install -r backend/requirements-dev.txt
+    python -m pytest -q tests
+"""
+from pathlib import Path
+from collections import Counter
+import os
+import sys
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "vizinhando_test")
+# mongomock has no change streams
+os.environ.setdefault("ORDER_EVENTS_SOURCE", "local")
+os.environ.setdefault("VALIDATE_RESPONSES", "true")
+
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+import database
+import server
+from services.cache import CACHES
+from services.auth import token_revocations
+
+@pytest.fixture
+def mongo_client():
+    return AsyncMongoMockClient()
+
+@pytest.fixture
+def db(mongo_client):
+    return mongo_client[os.environ["DB_NAME"]]
+
+@pytest.fixture
+def client(mongo_client, db, monkeypatch):
+    """TestClient on a fresh database, with every in-process cache emptied"""
+    async def connect_to_mock():
+        database.database.pool_monitor = database.PoolMonitor()
+        database.database.client = mongo_client
+        database.database.db = db
+
+    monkeypatch.setattr(server, "connect_to_mongo", connect_to_mock)
+    for cache in CACHES.values():
+        cache.invalidate()
+    token_revocations.clear()
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+def register(client, email="ana@example.pt", password="segredo123") -> dict:
+    """Register a user and return the bearer header for their access token"""
+    response = client.post("/api/users/register", json={
+        "name": "Ana", "email": email, "password": password, "phone": "+351 912 345 678",
+    })
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def restaurant_payload(**overrides) -> dict:
+    """A valid RestaurantCreate body"""
+    return {
+        "name": "Taberna Real",
+        "description": "Cozinha portuguesa tradicional",
+        "image": "https://example.pt/taberna.jpg",
+        "cuisine": "Portuguesa",
+        "rating": 4.8,
+        "deliveryTime": "25-35 min",
+        "deliveryFee": 2.5,
+        "categories": ["Portuguesa"],
+        "address": {"street": "Rua das Flores, 123", "city": "Lisboa", "postalCode": "1200-192"},
+        "contact": {"phone": "+351 212 345 678", "email": "geral@taberna.pt"},
+        "hours": {"open": "11:00", "close": "23:00"},
+        **overrides,
+    }
+
+# Collection methods that each send one command to the server
+DB_COMMANDS = {
+    "find", "find_one", "aggregate", "count_documents", "distinct",
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "bulk_write",
+    "find_one_and_update", "find_one_and_replace", "find_one_and_delete",
+}
+
+class CountingCollection:
+    def __init__(self, collection, calls: Counter):
+        self._collection = collection
+        self._calls = calls
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in DB_COMMANDS:
+            return attribute
+        
+        def counted(*args, **kwargs):
+            self._calls[f"{self._collection.name}.{name}"] += 1
+            return attribute(*args, **kwargs)
+        return counted
+
+class CountingDatabase:
+    """Database proxy recording "collection.method" for every command handlers send"""
+
+    def __init__(self, db):
+        self._db = db
+        self.calls = Counter()
+
+    def __getitem__(self, name):
+        return CountingCollection(self._db[name], self.calls)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._db, name)
+        if name == "command":
+            def counted(*args, **kwargs):
+                self.calls["command"] += 1
+                return attribute(*args, **kwargs)
+            return counted
+        return CountingCollection(attribute, self.calls)
+
+@pytest.fixture
+def db_calls(client, db, monkeypatch) -> Counter:
+    """Counter of database commands issued by requests made through `client`"""
+    counting = CountingDatabase(db)
+    monkeypatch.setattr(database.database, "db", counting)
+    return counting.calls
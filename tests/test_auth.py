@@ -0,0 +1,50 @@
+import services.auth
+from services.auth import TokenRevocations
+from services.cache import CACHES
+from tests.conftest import register
+
+def expire_caches():
+    """What PRINCIPAL_CACHE_TTL_SECONDS passing (or LRU eviction) does to the auth caches"""
+    for cache in CACHES.values():
+        cache.invalidate()
+
+def test_logout_revokes_access_token(client):
+    headers = register(client)
+    assert client.get("/api/orders/", headers=headers).status_code == 200
+    
+    assert client.post("/api/users/logout", headers=headers).status_code == 200
+    assert client.get("/api/orders/", headers=headers).status_code == 401
+    assert client.get("/api/users/profile", headers=headers).status_code == 401
+
+def test_revocation_outlives_principal_caches(client):
+    headers = register(client)
+    client.post("/api/users/logout", headers=headers)
+    
+    expire_caches()
+    assert client.get("/api/orders/", headers=headers).status_code == 401
+    assert client.get("/api/users/profile", headers=headers).status_code == 401
+
+def test_new_login_after_logout_is_accepted(client):
+    headers = register(client)
+    client.post("/api/users/logout", headers=headers)
+    
+    login = client.post("/api/users/login", json={"email": "ana@example.pt", "password": "segredo123"})
+    fresh = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    expire_caches()
+    assert client.get("/api/orders/", headers=fresh).status_code == 200
+
+def test_revocations_expire_oldest_first(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(services.auth.time, "monotonic", lambda: clock[0])
+    revocations = TokenRevocations(ttl=60)
+    revocations.record("ana", 1)
+    revocations.record("rui", 1)
+    clock[0] += 30
+    revocations.record("ana", 2)
+    clock[0] += 45
+    revocations.record("eva", 1)
+    
+    # rui expired; ana's second record restarted her TTL
+    assert revocations.stats()["size"] == 2
+    assert revocations.is_revoked("ana", 1)
+    assert not revocations.is_revoked("rui", 0)
@@ -0,0 +1,24 @@
+import json
+import pytest
+from tests.conftest import restaurant_payload
+
+@pytest.mark.parametrize("collection, restaurant_id", [
+    ("menu_items", "not-an-id"),
+    ("restaurants", "64b7f0c2a1b2c3d4e5f60718"),
+])
+def test_export_rejects_bad_restaurant_filter(client, collection, restaurant_id):
+    response = client.get(f"/api/bulk/{collection}", params={"restaurantId": restaurant_id})
+    assert response.status_code == 400
+
+def test_export_filters_menu_items_by_restaurant(client):
+    restaurants = [client.post("/api/restaurants/", json=restaurant_payload(name=name)).json() for name in ("Taberna Real", "Tasca Velha")]
+    for restaurant in restaurants:
+        client.post("/api/menu-items/", json={
+            "restaurantId": restaurant["_id"], "name": "Bacalhau à Brás", "description": "Clássico",
+            "price": 14.5, "image": "https://example.pt/bacalhau.jpg", "category": "Pratos",
+        })
+    
+    response = client.get("/api/bulk/menu_items", params={"restaurantId": restaurants[0]["_id"]})
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["restaurantId"] for row in rows] == [restaurants[0]["_id"]]
@@ -0,0 +1,18 @@
+from services.conditional import versions_cache
+
+def version_calls(client, db_calls) -> list:
+    versions_cache.invalidate()
+    db_calls.clear()
+    assert client.get("/api/categories").status_code == 200
+    return sorted(call for call in db_calls.elements() if call.startswith("collection_versions."))
+
+def test_version_is_created_once_then_only_read(client, db_calls):
+    assert version_calls(client, db_calls) == [
+        "collection_versions.find_one", "collection_versions.find_one_and_update",
+    ]
+    assert version_calls(client, db_calls) == ["collection_versions.find_one"]
+
+def test_version_survives_cache_misses(client):
+    first = client.get("/api/categories").headers["ETag"]
+    versions_cache.invalidate()
+    assert client.get("/api/categories").headers["ETag"] == first
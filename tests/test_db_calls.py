@@ -0,0 +1,85 @@
+"""
+Database commands per write handler: creates return the inserted document
+and updates use find_one_and_update, so none of them reads its result back.
+"""
+from collections import Counter
+import pytest
+from tests.conftest import register, restaurant_payload
+
+VERSION_BUMP = "collection_versions.update_one"
+
+def calls_for(db_calls: Counter, request) -> Counter:
+    db_calls.clear()
+    response = request()
+    assert response.status_code == 200, response.text
+    return Counter(db_calls)
+
+@pytest.fixture
+def restaurant(client):
+    return client.post("/api/restaurants/", json=restaurant_payload()).json()
+
+@pytest.fixture
+def menu_item(client, restaurant):
+    return client.post("/api/menu-items/", json={
+        "restaurantId": restaurant["_id"], "name": "Bacalhau à Brás", "description": "Clássico",
+        "price": 14.5, "image": "https://example.pt/bacalhau.jpg", "category": "Pratos",
+    }).json()
+
+def test_create_restaurant(client, db_calls):
+    calls = calls_for(db_calls, lambda: client.post("/api/restaurants/", json=restaurant_payload()))
+    assert calls == Counter({"restaurants.insert_one": 1, VERSION_BUMP: 1})
+
+def test_update_restaurant(client, db_calls, restaurant):
+    update = lambda body: lambda: client.put(f"/api/restaurants/{restaurant['_id']}", json=body)
+    
+    assert calls_for(db_calls, update({"rating": 4.9})) == Counter({
+        "restaurants.find_one_and_update": 1, VERSION_BUMP: 1,
+    })
+    # Open intervals and location derive from the request alone and share its $set
+    assert calls_for(db_calls, update({"hours": {"open": "12:00", "close": "22:00"}})) == Counter({
+        "restaurants.find_one_and_update": 1, VERSION_BUMP: 1,
+    })
+    # searchTerms combine stored fields, so they are written in one extra update
+    assert calls_for(db_calls, update({"name": "Taberna Nova"})) == Counter({
+        "restaurants.find_one_and_update": 1, "restaurants.update_one": 1, VERSION_BUMP: 1,
+    })
+
+def test_create_category(client, db_calls):
+    calls = calls_for(db_calls, lambda: client.post("/api/categories/", json={"name": "Pizza", "icon": "🍕", "color": "red"}))
+    assert calls == Counter({"categories.insert_one": 1, VERSION_BUMP: 1})
+
+def test_create_menu_item(client, db_calls, restaurant):
+    calls = calls_for(db_calls, lambda: client.post("/api/menu-items/", json={
+        "restaurantId": restaurant["_id"], "name": "Francesinha", "description": "Do Porto",
+        "price": 12.9, "image": "https://example.pt/francesinha.jpg", "category": "Pratos",
+    }))
+    assert calls == Counter({"menu_items.insert_one": 1, VERSION_BUMP: 1})
+
+def test_update_menu_item(client, db_calls, menu_item):
+    calls = calls_for(db_calls, lambda: client.put(f"/api/menu-items/{menu_item['_id']}", json={"price": 15.0}))
+    assert calls == Counter({"menu_items.find_one_and_update": 1, VERSION_BUMP: 1})
+
+def test_create_order(client, db_calls, restaurant, menu_item):
+    headers = register(client)
+    body = {
+        "restaurantId": restaurant["_id"],
+        "items": [{"menuItemId": menu_item["_id"], "quantity": 2}],
+        "deliveryAddress": {"street": "Rua Augusta, 1", "city": "Lisboa", "postalCode": "1100-053"},
+        "paymentMethod": "mbway",
+    }
+    calls = calls_for(db_calls, lambda: client.post("/api/orders/", json=body, headers=headers))
+    assert calls == Counter({
+        "restaurants.find_one": 1,
+        "menu_items.find": 1,
+        # Kitchen load for the delivery quote, memoized per window afterwards
+        "orders.aggregate": 1,
+        "orders.insert_one": 1,
+    })
+
+def test_update_user_profile(client, db_calls):
+    headers = register(client)
+    # Resolve the user once so the principal cache is warm, as for a signed-in client
+    client.get("/api/users/profile", headers=headers)
+    
+    calls = calls_for(db_calls, lambda: client.put("/api/users/profile", json={"name": "Ana Silva"}, headers=headers))
+    assert calls == Counter({"users.find_one_and_update": 1})
@@ -0,0 +1,23 @@
+from datetime import datetime
+import asyncio
+from tests.conftest import restaurant_payload
+
+def quotes(client) -> dict:
+    return {item["name"]: item["deliveryQuote"] for item in client.get("/api/restaurants/").json()["items"]}
+
+def test_unknown_timezone_falls_back_to_default(client, db):
+    # Stored before timezones were validated on write
+    document = restaurant_payload(name="Base Marte", hours={"open": "11:00", "close": "23:00", "timezone": "Mars/Base"})
+    document["createdAt"] = document["updatedAt"] = datetime.utcnow()
+    asyncio.run(db.restaurants.insert_one(document))
+    
+    response = client.get("/api/restaurants/")
+    assert response.status_code == 200
+    assert response.json()["items"][0]["deliveryQuote"]["fee"] >= 2.5
+
+def test_fee_change_applies_to_quotes_at_once(client):
+    restaurant = client.post("/api/restaurants/", json=restaurant_payload()).json()
+    before = quotes(client)["Taberna Real"]["fee"]
+    
+    client.put(f"/api/restaurants/{restaurant['_id']}", json={"deliveryFee": 4.5})
+    assert quotes(client)["Taberna Real"]["fee"] == round(before + 2.0, 2)
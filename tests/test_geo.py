@@ -0,0 +1,77 @@
+"""
+near_restaurants paging against a $geoNear stand-in (mongomock has no geo
+stages). The stand-in returns equidistant restaurants in descending _id
+order, so paging must not rely on how $geoNear breaks ties.
+"""
+from bson import ObjectId
+import asyncio
+import mongomock
+from services.geo import distance_km, geo_point, near_restaurants
+
+USER = (38.7107, -9.1422)
+
+class GeoNearCollection:
+    def __init__(self, documents):
+        self.collection = mongomock.MongoClient().db.restaurants
+        self.collection.insert_many(documents)
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        geo_near = pipeline[0]["$geoNear"]
+        lng, lat = geo_near["near"]["coordinates"]
+        results = []
+        for document in self.collection.find(geo_near["query"]):
+            distance = distance_km(document["location"], lat, lng) * 1000
+            if geo_near.get("minDistance", 0) <= distance <= geo_near["maxDistance"]:
+                results.append({**document, "distance": distance})
+        results.sort(key=lambda document: document["_id"], reverse=True)
+        results.sort(key=lambda document: document["distance"])
+        results = [document for document in results if document["distance"] <= document["deliveryRadiusKm"] * 1000]
+        limit = next(stage["$limit"] for stage in pipeline if "$limit" in stage)
+        documents = [{**document, "distanceKm": round(document["distance"] / 1000, 2)} for document in results[:limit]]
+        
+        class Cursor:
+            async def to_list(self, length):
+                return documents
+        return Cursor()
+
+class FakeDatabase:
+    def __init__(self, restaurants):
+        self.restaurants = restaurants
+
+def restaurant(lat, lng, radius=5.0):
+    return {"_id": ObjectId(), "name": f"{lat},{lng}", "location": geo_point(lat, lng), "deliveryRadiusKm": radius}
+
+def all_pages(db, limit):
+    async def run():
+        pages, cursor = [], None
+        while True:
+            page, cursor = await near_restaurants(db, *USER, {}, limit, cursor)
+            pages.append(page)
+            if cursor is None:
+                return pages
+    return asyncio.run(run())
+
+def test_pages_cover_every_deliverable_restaurant_once_nearest_first():
+    documents = (
+        # Seven restaurants in one building straddle several page boundaries
+        [restaurant(38.7150, -9.1400) for _ in range(7)]
+        + [restaurant(38.70 + i * 0.003, -9.14 - i * 0.002) for i in range(10)]
+        + [restaurant(38.80, -9.00, radius=2.0)]  # too far for its own radius
+    )
+    db = FakeDatabase(GeoNearCollection(documents))
+    pages = all_pages(db, limit=3)
+    
+    returned = [document for page in pages for document in page]
+    ids = [document["_id"] for document in returned]
+    assert len(ids) == len(set(ids)) == 17
+    distances = [document["distanceKm"] for document in returned]
+    assert distances == sorted(distances)
+    assert all(len(page) <= 3 for page in pages)
+
+def test_pipeline_does_not_sort_the_geo_stream():
+    db = FakeDatabase(GeoNearCollection([restaurant(38.7150, -9.1400) for _ in range(5)]))
+    all_pages(db, limit=2)
+    for pipeline in db.restaurants.pipelines:
+        assert not any("$sort" in stage for stage in pipeline)
@@ -0,0 +1,19 @@
+import base64
+import pytest
+
+def token(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    token("not json"),
+    token('{"a": 1}'),
+    token('[{"$oid": "zz"}]'),
+    token('[{"$date": "xx"}]'),
+    token('[{"$numberDecimal": "abc"}]'),
+    token('[{"$date": 99999999999999999999}]'),
+    token('[{"$timestamp": {"t": "a"}}]'),
+    token('[{"$minKey": 2}]'),
+])
+def test_malformed_cursor_is_a_client_error(client, cursor):
+    assert client.get("/api/categories", params={"cursor": cursor}).status_code == 400
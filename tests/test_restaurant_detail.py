@@ -0,0 +1,29 @@
+from bson import ObjectId
+import asyncio
+import services.restaurant_detail
+from services.conditional import bump_collection_version
+from services.restaurant_detail import get_restaurant_detail, invalidate_restaurant_detail
+from tests.conftest import restaurant_payload
+
+def test_write_during_build_is_not_cached_over(client, db, monkeypatch):
+    restaurant = client.post("/api/restaurants/", json=restaurant_payload()).json()
+    menu_item = client.post("/api/menu-items/", json={
+        "restaurantId": restaurant["_id"], "name": "Bacalhau à Brás", "description": "Clássico",
+        "price": 14.5, "image": "https://example.pt/bacalhau.jpg", "category": "Pratos",
+    }).json()
+    build = services.restaurant_detail.build_restaurant_detail
+    
+    async def build_then_write(db, restaurant_id):
+        # The item is marked unavailable after this build read the menu
+        payload = await build(db, restaurant_id)
+        await db.menu_items.update_one({"_id": ObjectId(menu_item["_id"])}, {"$set": {"isAvailable": False}})
+        await bump_collection_version(db, "menu_items")
+        invalidate_restaurant_detail(restaurant_id)
+        return payload
+    
+    monkeypatch.setattr(services.restaurant_detail, "build_restaurant_detail", build_then_write)
+    asyncio.run(get_restaurant_detail(db, ObjectId(restaurant["_id"])))
+    monkeypatch.setattr(services.restaurant_detail, "build_restaurant_detail", build)
+    
+    detail = client.get(f"/api/restaurants/{restaurant['_id']}/detail").json()
+    assert detail["menu"][0]["items"][0]["isAvailable"] is False
@@ -0,0 +1,32 @@
+import json
+import pytest
+from tests.conftest import restaurant_payload
+
+BAD_HOURS = [
+    {"open": "11h00", "close": "23:00"},
+    {"open": "11:00", "close": "25:00"},
+    {"open": "11:00", "close": "23:00", "timezone": "Mars/Base"},
+]
+
+@pytest.mark.parametrize("hours", BAD_HOURS)
+def test_create_rejects_bad_hours(client, hours):
+    assert client.post("/api/restaurants/", json=restaurant_payload(hours=hours)).status_code == 422
+
+@pytest.mark.parametrize("hours", BAD_HOURS)
+def test_update_rejects_bad_hours(client, hours):
+    restaurant = client.post("/api/restaurants/", json=restaurant_payload()).json()
+    assert client.put(f"/api/restaurants/{restaurant['_id']}", json={"hours": hours}).status_code == 422
+
+def test_valid_hours_are_accepted(client):
+    hours = {"open": "18:30", "close": "24:00", "timezone": "Atlantic/Azores"}
+    response = client.post("/api/restaurants/", json=restaurant_payload(hours=hours))
+    assert response.status_code == 200
+    assert response.json()["hours"] == hours
+
+def test_bulk_import_rejects_bad_hours(client):
+    rows = [restaurant_payload(), restaurant_payload(name="Base Marte", hours=BAD_HOURS[2])]
+    body = "\n".join(json.dumps(row) for row in rows)
+    report = client.post("/api/bulk/restaurants", content=body).json()
+    assert report["inserted"] == 1
+    assert report["failed"] == 1
+    assert report["errors"][0]["line"] == 2
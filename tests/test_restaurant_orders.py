@@ -0,0 +1,51 @@
+from bson import ObjectId
+import asyncio
+import pytest
+import services.auth
+from tests.conftest import register, restaurant_payload
+
+STAFF_KEY = "staff-secret"
+
+@pytest.fixture
+def restaurant_id(db):
+    restaurant_id = ObjectId()
+    asyncio.run(db.restaurants.insert_one({"_id": restaurant_id, "name": "Taberna Real"}))
+    return str(restaurant_id)
+
+def test_order_queue_is_closed_without_staff_key_configured(client, restaurant_id, monkeypatch):
+    monkeypatch.setattr(services.auth, "STAFF_API_KEY", None)
+    response = client.get(f"/api/restaurants/{restaurant_id}/orders", headers={"X-Staff-Key": STAFF_KEY})
+    assert response.status_code == 403
+
+def test_order_queue_requires_staff_key(client, restaurant_id, monkeypatch):
+    monkeypatch.setattr(services.auth, "STAFF_API_KEY", STAFF_KEY)
+    assert client.get(f"/api/restaurants/{restaurant_id}/orders").status_code == 401
+    assert client.get(f"/api/restaurants/{restaurant_id}/orders", headers={"X-Staff-Key": "guess"}).status_code == 401
+    
+    response = client.get(f"/api/restaurants/{restaurant_id}/orders", headers={"X-Staff-Key": STAFF_KEY})
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+
+def test_status_update_requires_staff_key(client, monkeypatch):
+    monkeypatch.setattr(services.auth, "STAFF_API_KEY", STAFF_KEY)
+    headers = register(client)
+    restaurant = client.post("/api/restaurants/", json=restaurant_payload()).json()
+    menu_item = client.post("/api/menu-items/", json={
+        "restaurantId": restaurant["_id"], "name": "Bacalhau à Brás", "description": "Clássico",
+        "price": 14.5, "image": "https://example.pt/bacalhau.jpg", "category": "Pratos",
+    }).json()
+    order = client.post("/api/orders/", headers=headers, json={
+        "restaurantId": restaurant["_id"],
+        "items": [{"menuItemId": menu_item["_id"], "quantity": 1}],
+        "deliveryAddress": {"street": "Rua Augusta, 1", "city": "Lisboa", "postalCode": "1100-053"},
+        "paymentMethod": "mbway",
+    }).json()
+    url = f"/api/orders/{order['id']}/status"
+    
+    # A customer's bearer token does not make them staff
+    assert client.put(url, json={"status": "cancelled"}, headers=headers).status_code == 401
+    assert client.put(url, json={"status": "cancelled"}, headers={"X-Staff-Key": "guess"}).status_code == 401
+    
+    response = client.put(url, json={"status": "confirmed"}, headers={"X-Staff-Key": STAFF_KEY})
+    assert response.status_code == 200
+    assert response.json()["status"] == "confirmed"
@@ -0,0 +1,25 @@
+import pytest
+from tests.conftest import restaurant_payload
+
+def names(client, category) -> list:
+    page = client.get("/api/restaurants/summary", params={"category": category}).json()
+    return sorted(restaurant["name"] for restaurant in page["items"])
+
+@pytest.fixture
+def restaurants(client):
+    client.post("/api/restaurants/", json=restaurant_payload(name="Burger House", cuisine="Hambúrgueres", categories=["Fast Food"]))
+    client.post("/api/restaurants/", json=restaurant_payload(name="Pizza da Nonna", cuisine="Italiana", categories=["Pizza", "Massa"]))
+    return client.post("/api/restaurants/", json=restaurant_payload()).json()
+
+def test_category_matches_cuisine_or_categories_exactly(client, restaurants):
+    assert names(client, "Hambúrgueres") == ["Burger House"]
+    assert names(client, "hamburgueres") == ["Burger House"]
+    assert names(client, "Pizza") == ["Pizza da Nonna"]
+    assert names(client, "Fast  Food") == ["Burger House"]
+    # Substrings no longer match: the slider sends whole names
+    assert names(client, "Ital") == []
+
+def test_category_follows_updates(client, restaurants):
+    client.put(f"/api/restaurants/{restaurants['_id']}", json={"cuisine": "Italiana"})
+    assert names(client, "Italiana") == ["Pizza da Nonna", "Taberna Real"]
+    assert names(client, "Portuguesa") == ["Taberna Real"]
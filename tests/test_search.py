@@ -0,0 +1,44 @@
+from bson import ObjectId
+import asyncio
+import pytest
+import services.search
+from services.search import sync_search_terms
+from tests.conftest import restaurant_payload
+
+def test_broad_search_ranks_best_rated_and_reports_truncation(client, monkeypatch):
+    monkeypatch.setattr(services.search, "SEARCH_MAX_CANDIDATES", 2)
+    for name, rating in [("Pizza Roma", 3.9), ("Pizza Napoli", 4.7), ("Pizza Bella", 4.2)]:
+        assert client.post("/api/restaurants/", json=restaurant_payload(name=name, rating=rating)).status_code == 200
+    
+    page = client.get("/api/restaurants/summary", params={"search": "pizza"}).json()
+    assert page["truncated"] is True
+    assert sorted(restaurant["name"] for restaurant in page["items"]) == ["Pizza Bella", "Pizza Napoli"]
+
+def test_narrow_search_is_not_truncated(client):
+    client.post("/api/restaurants/", json=restaurant_payload(name="Pizza Roma"))
+    page = client.get("/api/restaurants/summary", params={"search": "roma"}).json()
+    assert page["truncated"] is False
+    assert [restaurant["name"] for restaurant in page["items"]] == ["Pizza Roma"]
+
+@pytest.mark.parametrize("search, names", [
+    ("t", ["Taberna Real"]),
+    ("x", []),
+    ("do", ["Doces do Porto"]),
+    ("?!", []),
+])
+def test_short_and_stopword_searches_still_filter(client, search, names):
+    for name in ("Pizza Roma", "Doces do Porto", "Taberna Real"):
+        client.post("/api/restaurants/", json=restaurant_payload(name=name, description="Cozinha caseira"))
+    page = client.get("/api/restaurants/summary", params={"search": search}).json()
+    assert sorted(restaurant["name"] for restaurant in page["items"]) == names
+
+def test_search_terms_follow_a_concurrent_update(client, db):
+    restaurant = client.post("/api/restaurants/", json=restaurant_payload(name="Pizza Roma")).json()
+    stale = asyncio.run(db.restaurants.find_one({"_id": ObjectId(restaurant["_id"])}))
+    # Another request renames the restaurant after this one read its post-image
+    asyncio.run(db.restaurants.update_one({"_id": stale["_id"]}, {"$set": {"name": "Tasca Velha"}}))
+    
+    terms = asyncio.run(sync_search_terms(db, stale))
+    stored = asyncio.run(db.restaurants.find_one({"_id": stale["_id"]}))
+    assert stored["searchTerms"] == terms["searchTerms"]
+    assert "tasca" in terms["searchTerms"] and "pizza" not in terms["searchTerms"]
@@ -0,0 +1,22 @@
+from datetime import datetime
+import asyncio
+from models.restaurant import RestaurantCreate
+from services.serialization import backfill_defaults
+from tests.conftest import restaurant_payload
+
+def test_backfill_fills_defaults_missing_from_old_documents(client, db):
+    # Stored before deliveryRadiusKm, isOpen and promo existed
+    document = restaurant_payload()
+    for field in ("deliveryRadiusKm", "isOpen", "promo"):
+        document.pop(field, None)
+    document["createdAt"] = document["updatedAt"] = datetime.utcnow()
+    restaurant_id = asyncio.run(db.restaurants.insert_one(document)).inserted_id
+    
+    assert asyncio.run(backfill_defaults(db.restaurants, RestaurantCreate)) == 1
+    assert asyncio.run(backfill_defaults(db.restaurants, RestaurantCreate)) == 0
+    
+    restaurant = client.get(f"/api/restaurants/{restaurant_id}").json()
+    assert restaurant["isOpen"] is True
+    assert restaurant["promo"] is None
+    assert restaurant["deliveryRadiusKm"] > 0
+    assert restaurant["rating"] == 4.8
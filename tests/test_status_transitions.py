@@ -0,0 +1,86 @@
+"""
+Concurrent order status changes: hundreds of transitions race against a few
+orders, half of them with optimistic concurrency, and every order's
+statusHistory must remain a valid path through ORDER_TRANSITIONS.
+"""
+from fastapi import HTTPException
+from bson import ObjectId
+from collections import Counter
+import asyncio
+import random
+from services.orders import ORDER_STATUSES, ORDER_TRANSITIONS, transition_order, utcnow
+
+ORDERS = 20
+TRANSITIONS = 500
+
+async def seed(db, count: int):
+    now = utcnow()
+    ids = [ObjectId() for _ in range(count)]
+    await db.orders.insert_many([{
+        "_id": order_id,
+        "userId": ObjectId(),
+        "status": "pending",
+        "statusHistory": [{"status": "pending", "at": now}],
+        "createdAt": now,
+        "updatedAt": now,
+    } for order_id in ids])
+    return ids
+
+async def attempt(db, order_id, status, outcomes: Counter, accepted: Counter, optimistic: bool):
+    expected = None
+    if optimistic:
+        current = await db.orders.find_one({"_id": order_id}, {"updatedAt": 1})
+        expected = current["updatedAt"]
+    try:
+        await transition_order(db, order_id, status, expected)
+    except HTTPException as e:
+        outcomes[e.status_code] += 1
+    else:
+        outcomes[200] += 1
+        accepted[order_id] += 1
+
+def history_problems(order: dict, accepted: int) -> list:
+    problems = []
+    history = [change["status"] for change in order["statusHistory"]]
+    for source, target in zip(history, history[1:]):
+        if target not in ORDER_TRANSITIONS[source]:
+            problems.append(f"invalid transition {source} -> {target}")
+    if history[-1] != order["status"]:
+        problems.append(f"status {order['status']} but history ends at {history[-1]}")
+    if len(history) - 1 != accepted:
+        problems.append(f"{accepted} accepted changes but {len(history) - 1} history entries")
+    return problems
+
+def test_concurrent_transitions_keep_histories_valid(db):
+    async def run():
+        rng = random.Random(42)
+        ids = await seed(db, ORDERS)
+        statuses = sorted(ORDER_STATUSES)
+        outcomes, accepted = Counter(), Counter()
+        await asyncio.gather(*(
+            attempt(db, rng.choice(ids), rng.choice(statuses), outcomes, accepted, rng.random() < 0.5)
+            for _ in range(TRANSITIONS)
+        ))
+        orders = await db.orders.find({}).to_list(None)
+        return outcomes, accepted, orders
+    
+    outcomes, accepted, orders = asyncio.run(run())
+    assert sum(outcomes.values()) == TRANSITIONS
+    assert set(outcomes) <= {200, 409}
+    assert outcomes[200] > 0 and outcomes[409] > 0
+    for order in orders:
+        assert history_problems(order, accepted[order["_id"]]) == [], order["_id"]
+
+def test_racing_the_same_transition_succeeds_once(db):
+    async def run():
+        (order_id,) = await seed(db, 1)
+        outcomes, accepted = Counter(), Counter()
+        await asyncio.gather(*(
+            attempt(db, order_id, "confirmed", outcomes, accepted, optimistic=False)
+            for _ in range(100)
+        ))
+        return outcomes, await db.orders.find_one({"_id": order_id})
+    
+    outcomes, order = asyncio.run(run())
+    assert outcomes == Counter({200: 1, 409: 99})
+    assert [change["status"] for change in order["statusHistory"]] == ["pending", "confirmed"]